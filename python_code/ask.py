@@ -1,15 +1,23 @@
 import sys
 import json
 
-from query_service import answer_question
+from query_service import answer_question, parse_only
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python ask.py 'your question here'")
+    args = sys.argv[1:]
+    parse_only_mode = "--parse-only" in args
+    args = [a for a in args if a != "--parse-only"]
+    if not args:
+        print("Usage: python ask.py [--parse-only] 'your question here'")
         return 2
 
-    question = " ".join(sys.argv[1:])
+    question = " ".join(args)
+    if parse_only_mode:
+        # NLU only: skips pandas/numpy entirely
+        print(json.dumps(parse_only(question), ensure_ascii=False, indent=2))
+        return 0
+
     result = answer_question(question)
     resp = result["response"]
     print("Interpreted request:")
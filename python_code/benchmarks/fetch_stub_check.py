@@ -0,0 +1,189 @@
+"""
+Behaviour check for `summarizer.fetcher.FetchEngine` against a local stub API.
+
+Usage:
+    python3 -m benchmarks.fetch_stub_check
+
+Starts a stub HTTP server on a free localhost port and checks that the engine
+retries 429/5xx with exponential backoff (honouring `Retry-After`), gives up
+after `max_retries`, falls back to the next header style on 401, keeps a
+burst of concurrent GETs under the token-bucket rate, revalidates `HttpCache`
+entries with `If-None-Match` (a 304 is served from disk) and evicts them past
+`max_bytes`. Needs `requests`; no network access. Exit code 1 on failure so it can gate CI like `nlu.run_nlu_tests`.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from summarizer.fetcher import FetchEngine  # noqa: E402
+from summarizer.http_cache import HttpCache  # noqa: E402
+
+GOOD_KEY = "stub-key"
+# Failures served before a path succeeds: /flaky -> 503s, /throttled -> 429s
+FAILURES_BEFORE_OK = 2
+# /etag serves this validator and a padded body, so a few entries overflow a small cache
+ETAG = '"stub-v1"'
+ETAG_BODY = b'{"value": [], "padding": "' + b"x" * 1000 + b'"}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits: Dict[str, int] = defaultdict(int)
+    keys_seen: List[str] = []
+    times: List[float] = []
+    statuses: List[int] = []
+    lock = threading.Lock()
+
+    def log_message(self, fmt: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, headers: Dict[str, str] = None, body: bytes = None) -> None:
+        if body is None:
+            body = b"" if status == 304 else b'{"value": []}' if status == 200 else b"{}"
+        with self.lock:
+            self.statuses.append(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        key = f"{url.path}?{url.query}"
+        with self.lock:
+            self.hits[key] += 1
+            n = self.hits[key]
+            self.keys_seen.append(self.headers.get("api-key", ""))
+            self.times.append(time.monotonic())
+        if self.headers.get("api-key") != GOOD_KEY:
+            self._send(401)
+        elif url.path == "/flaky" and n <= FAILURES_BEFORE_OK:
+            self._send(503)
+        elif url.path == "/throttled" and n <= FAILURES_BEFORE_OK:
+            self._send(429, {"Retry-After": "0"})
+        elif url.path == "/down":
+            self._send(503)
+        elif url.path == "/etag" and self.headers.get("If-None-Match") == ETAG:
+            self._send(304, {"ETag": ETAG})
+        elif url.path == "/etag":
+            self._send(200, {"ETag": ETAG}, ETAG_BODY)
+        else:
+            self._send(200)
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls.lock:
+            cls.hits.clear()
+            cls.keys_seen.clear()
+            cls.times.clear()
+            cls.statuses.clear()
+
+
+def check_retry(base: str) -> Tuple[bool, str]:
+    engine = FetchEngine([{"api-key": GOOD_KEY}], rate_per_sec=None, max_retries=3, backoff=0.05)
+    for path in ("/flaky", "/throttled"):
+        start = time.monotonic()
+        resp = engine.get(base + path, params={"id": 1})
+        elapsed = time.monotonic() - start
+        # Backoff sleeps 0.05 s then 0.1 s (plus jitter) before the third attempt succeeds
+        if resp.status_code != 200 or StubHandler.hits[f"{path}?id=1"] != FAILURES_BEFORE_OK + 1 or elapsed < 0.15:
+            return False, f"{path}: status {resp.status_code}, {StubHandler.hits[f'{path}?id=1']} attempts, {elapsed:.2f} s"
+    return True, "503 and 429 retried with backoff until 200"
+
+
+def check_give_up(base: str) -> Tuple[bool, str]:
+    engine = FetchEngine([{"api-key": GOOD_KEY}], rate_per_sec=None, max_retries=2, backoff=0.01)
+    try:
+        engine.get(base + "/down")
+    except Exception as e:
+        attempts = StubHandler.hits["/down?"]
+        return attempts == 3, f"raised {type(e).__name__} after {attempts} attempts (expected 3)"
+    return False, "persistent 503 did not raise"
+
+
+def check_header_fallback(base: str) -> Tuple[bool, str]:
+    engine = FetchEngine([{"api-key": "wrong"}, {"api-key": GOOD_KEY}], rate_per_sec=None, backoff=0.01)
+    resp = engine.get(base + "/ok")
+    ok = resp.status_code == 200 and StubHandler.keys_seen == ["wrong", GOOD_KEY]
+    return ok, f"tried keys {StubHandler.keys_seen}, got {resp.status_code}"
+
+
+def check_rate(base: str, rate: float = 20.0, n: int = 21) -> Tuple[bool, str]:
+    engine = FetchEngine([{"api-key": GOOD_KEY}], max_workers=8, rate_per_sec=rate, burst=1)
+    start = time.monotonic()
+    engine.map(lambda i: engine.get(base + "/ok", params={"i": i}), range(n))
+    elapsed = time.monotonic() - start
+    # One token up front, then `rate` per second: n requests need at least (n - 1) / rate seconds
+    expected = (n - 1) / rate
+    return elapsed >= expected * 0.95, f"{n} GETs at {rate:g}/s in {elapsed:.2f} s (at least {expected:.2f} s expected)"
+
+
+def check_revalidate(base: str) -> Tuple[bool, str]:
+    with tempfile.TemporaryDirectory(prefix="zrh-http-cache-") as tmp:
+        cache = HttpCache(Path(tmp))
+        engine = FetchEngine([{"api-key": GOOD_KEY}], rate_per_sec=None, backoff=0.01, cache=cache)
+        first = engine.get(base + "/etag", params={"id": 1})
+        second = engine.get(base + "/etag", params={"id": 1})
+        ok = (
+            StubHandler.statuses == [200, 304]
+            and cache.revalidated == 1
+            and getattr(second, "from_cache", False)
+            and second.content == first.content == ETAG_BODY
+        )
+        return ok, f"statuses {StubHandler.statuses}, {cache.revalidated} revalidated, body from disk: {second.content == ETAG_BODY}"
+
+
+def check_evict(base: str, n: int = 6) -> Tuple[bool, str]:
+    with tempfile.TemporaryDirectory(prefix="zrh-http-cache-") as tmp:
+        # Room for about two entries of ~1.1 KB each
+        cache = HttpCache(Path(tmp), max_bytes=2500)
+        engine = FetchEngine([{"api-key": GOOD_KEY}], rate_per_sec=None, backoff=0.01, cache=cache)
+        for i in range(n):
+            engine.get(base + "/etag", params={"i": i})
+        on_disk = sum(f.stat().st_size for f in Path(tmp).rglob("*") if f.is_file())
+        ok = cache.stored == n and cache.evicted > 0 and on_disk <= cache.max_bytes
+        return ok, f"{cache.stored} stored, {cache.evicted} evicted, {on_disk} of {cache.max_bytes} bytes on disk"
+
+
+CHECKS: Dict[str, Callable[[str], Tuple[bool, str]]] = {
+    "retry_backoff": check_retry,
+    "give_up": check_give_up,
+    "header_fallback": check_header_fallback,
+    "rate_limit": check_rate,
+    "cache_revalidate": check_revalidate,
+    "cache_evict": check_evict,
+}
+
+
+def main() -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    ok = True
+    try:
+        for name, check in CHECKS.items():
+            StubHandler.reset()
+            passed, detail = check(base)
+            ok = ok and passed
+            print(f"{'OK  ' if passed else 'FAIL'} {name}: {detail}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
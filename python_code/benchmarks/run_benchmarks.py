@@ -0,0 +1,266 @@
+"""
+Performance benchmarks for the summarization pipeline, with regression thresholds.
+
+Usage:
+    python3 -m benchmarks.run_benchmarks [--scales current,depts_x100] [--repeat 5]
+        [--output results.json] [--baseline benchmarks/baseline.json] [--margin 0.5]
+        [--save-baseline benchmarks/baseline.json] [--json]
+
+Times the pipeline stages (CSV load, calibration, summarize, Theil–Sen, fuzzy
+labels, NLU parsing, end-to-end `answer_question`) on the shipped table and on
+seeded synthetic tables (`summarizer.synthetic`) with more departments, years
+or account rows.
+Results are written as JSON (median and min milliseconds per case). With a
+baseline, a case fails when its fastest run (`--metric`, min by default: the
+least noisy statistic on shared machines) exceeds the baseline by more than
+`--margin` (relative) and `--slack-ms` (absolute, to ignore timer noise); the
+exit code is then 1, so it can gate CI like `nlu.run_nlu_tests`. Baselines are
+machine-specific: record one with `--save-baseline` on the machine that checks it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import query_service  # noqa: E402
+import summarizer.zurich_budget_linguistic_summaries as zbls  # noqa: E402
+from nlu import parse_question, parse_questions  # noqa: E402
+from summarizer import FIELD_TO_DEPT, YEARS, colstore  # noqa: E402
+from summarizer.calibration_sketch import CalibrationSketch  # noqa: E402
+from summarizer.drilldown import summarize_groups  # noqa: E402
+from summarizer.synthetic import SyntheticSpec, generate_account_rows, generate_budget  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().with_name("baseline.json")
+# Seeded synthetic variants of the shipped table (see summarizer.synthetic); None = the real CSV
+SCALES: Dict[str, Optional[SyntheticSpec]] = {
+    "current": None,
+    "depts_x100": SyntheticSpec(departments=1000),
+    "years_50": SyntheticSpec(departments=100, years=50, missing=0.05),
+    "accounts_x100": SyntheticSpec(departments=10, accounts=100),
+    "stress_10k_x50": SyntheticSpec(departments=10000, years=50, missing=0.05),
+}
+# The stress scale takes minutes on the scalar cases; run it explicitly
+DEFAULT_SCALES = ["current", "depts_x100", "years_50", "accounts_x100"]
+
+
+@contextmanager
+def working_dir(path: Path) -> Iterator[None]:
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def time_case(fn: Callable[[], object], repeat: int, warmup: int, max_seconds: float) -> Dict:
+    for _ in range(warmup):
+        fn()
+    times: List[float] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+        if time.perf_counter() - started > max_seconds:
+            break
+    return {"runs": len(times), "median_ms": round(statistics.median(times), 4), "min_ms": round(min(times), 4)}
+
+
+def load_questions() -> List[str]:
+    with (ROOT / "nlu" / "nlu_test_set.json").open("r", encoding="utf-8") as f:
+        return [item["utterance"] for item in json.load(f)["items"]]
+
+
+def nlu_cases(questions: List[str]) -> Dict[str, Callable[[], object]]:
+    dept_names = list(FIELD_TO_DEPT.values())
+    return {
+        "parse_question": lambda: [parse_question(q, YEARS, FIELD_TO_DEPT, dept_names) for q in questions],
+        "parse_questions": lambda: parse_questions(questions, YEARS, FIELD_TO_DEPT, dept_names),
+    }
+
+
+def data_cases(df: pd.DataFrame, data_dir: Path, questions: List[str]) -> Dict[str, Callable[[], object]]:
+    """Cases that depend on the dataset; `data_dir` holds its CSV so `load_or_fetch` finds it."""
+    level_mfs, trend_mfs = zbls.ensure_calibration(df)
+    matrix = zbls.ShareMatrix.from_frame(df)
+    series = [matrix.observed(i) for i in range(len(matrix))]
+    last_shares = [s[-1] for _, s in series]
+    slope_values = zbls.theil_sen_slopes(matrix.years, matrix.shares).tolist()
+
+    def load():
+        with working_dir(data_dir):
+            return zbls.load_or_fetch(YEARS)
+
+    def cold_calibration():
+        # Drop the in-memory cache only; the calibration file is read, never rewritten
+        zbls.clear_calibration_cache()
+        return zbls.ensure_calibration(df)
+
+    def calibrate():
+        zbls.calibrate_level_mfs_from_quantiles(zbls.compute_share_distribution(df))
+        return zbls.calibrate_trend_mfs_from_mad(zbls.compute_trend_distribution(df))
+
+    # Adding the latest year to a sketch of the earlier ones, as recompute_membership does
+    last_year = int(df["jahr"].max())
+    history = CalibrationSketch.from_frame(df[df["jahr"] < last_year])
+    latest = df[df["jahr"] == last_year]
+
+    def calibrate_incremental():
+        return zbls.calibrate_from_sketch(history.copy().fold(latest))
+
+    def answer_all():
+        query_service.RESPONSE_CACHE.clear()
+        with working_dir(data_dir):
+            return [query_service.answer_question(q) for q in questions]
+
+    cases = {
+        "load_or_fetch": load,
+        "calibrate": calibrate,
+        "calibrate_incremental": calibrate_incremental,
+        "share_matrix": lambda: zbls.ShareMatrix.from_frame(df),
+        "summarize": lambda: zbls.summarize(df, level_mfs=level_mfs, trend_mfs=trend_mfs),
+        "theil_sen_slope": lambda: [zbls.theil_sen_slope(y, s) for y, s in series],
+        "theil_sen_slopes": lambda: zbls.theil_sen_slopes(matrix.years, matrix.shares),
+        "label_level_trend": lambda: [
+            (zbls.label_level(a, level_mfs), zbls.label_trend(b, trend_mfs))
+            for a, b in zip(last_shares, slope_values)
+        ],
+        "label_levels_trends": lambda: (
+            zbls.label_levels(last_shares, level_mfs),
+            zbls.label_trends(slope_values, trend_mfs),
+        ),
+        "answer_question": answer_all,
+    }
+    if zbls.load_calibration() is not None:
+        cases["ensure_calibration"] = cold_calibration
+    return cases
+
+
+def run(scales: List[str], repeat: int, warmup: int, max_seconds: float, log=sys.stderr) -> Dict[str, Dict]:
+    questions = load_questions()
+    results: Dict[str, Dict] = {}
+    base_csv = zbls.find_aggregate_csv()
+    if base_csv is None:
+        raise RuntimeError("benchmarks need the cached zrh_budget_by_dept_year.csv")
+    base = pd.read_csv(base_csv)
+
+    def record(name: str, fn: Callable[[], object], rows: int) -> None:
+        res = time_case(fn, repeat, warmup, max_seconds)
+        res["rows"] = rows
+        results[name] = res
+        print(f"{name:<40} {res['median_ms']:>11.3f} ms  (min {res['min_ms']:.3f}, {res['runs']} runs)", file=log)
+
+    for name, fn in nlu_cases(questions).items():
+        record(f"current/{name}", fn, len(questions))
+
+    with tempfile.TemporaryDirectory(prefix="zrh-bench-") as tmp:
+        for scale in scales:
+            spec = SCALES[scale]
+            if spec is None:
+                df, data_dir = base, base_csv.parent
+            else:
+                df = generate_budget(spec)
+                data_dir = Path(tmp) / scale
+                data_dir.mkdir()
+                df.to_csv(data_dir / zbls.AGGREGATE_CSV_NAME, index=False)
+                # load_or_fetch only reads the column store; build it as the sync path would
+                colstore.write_table(df, data_dir / zbls.AGGREGATE_CSV_NAME)
+            if spec is not None and spec.accounts:
+                rows = generate_account_rows(spec)
+                record(f"{scale}/summarize_groups", lambda: summarize_groups(rows, ["departement", "sachkonto"]), len(rows))
+                record(f"{scale}/summarize_groups_within", lambda: summarize_groups(
+                    rows, ["departement", "institution", "sachkonto"], within=["departement"]), len(rows))
+                continue
+            for case, fn in data_cases(df, data_dir, questions).items():
+                record(f"{scale}/{case}", fn, len(df))
+    return results
+
+
+def compare(
+    results: Dict[str, Dict], baseline: Dict[str, Dict], margin: float, slack_ms: float, metric: str = "min_ms"
+) -> List[str]:
+    """Return a message for every case slower than its baseline beyond margin and slack."""
+    failures = []
+    for name, res in results.items():
+        ref = baseline.get(name)
+        if ref is None:
+            continue
+        limit = max(ref[metric] * (1.0 + margin), ref[metric] + slack_ms)
+        if res[metric] > limit:
+            failures.append(f"{name}: {res[metric]:.3f} ms > {limit:.3f} ms (baseline {ref[metric]:.3f} ms)")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES), help=f"Comma-separated subset of {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Stop repeating a case after this long")
+    parser.add_argument("--output", type=Path, help="Write the results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--margin", type=float, default=0.5, help="Allowed relative slowdown (0.5 = 50%%)")
+    parser.add_argument("--slack-ms", type=float, default=1.0, help="Allowed absolute slowdown per case")
+    parser.add_argument("--metric", choices=("min_ms", "median_ms"), default="min_ms", help="Statistic compared")
+    parser.add_argument("--save-baseline", type=Path, help="Store these results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="Print the results JSON to stdout")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    results = run(scales, args.repeat, args.warmup, args.max_seconds)
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    failures: List[str] = []
+    if args.baseline.exists() and args.save_baseline is None:
+        with args.baseline.open("r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        failures = compare(results, baseline, args.margin, args.slack_ms, args.metric)
+        report["baseline"] = {"path": str(args.baseline), "metric": args.metric, "margin": args.margin,
+                              "slack_ms": args.slack_ms, "failures": failures}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.save_baseline.write_text(text + "\n", encoding="utf-8")
+        print(f"Saved baseline to {args.save_baseline}", file=sys.stderr)
+    if args.json:
+        print(text)
+    for msg in failures:
+        print(f"REGRESSION {msg}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
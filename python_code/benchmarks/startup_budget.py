@@ -0,0 +1,81 @@
+"""
+Import-time budget for the CLI entry points.
+
+Usage:
+    python3 -m benchmarks.startup_budget [--budget-ms 50] [--json]
+
+Runs `python -X importtime` on the parse-only import path (`query_service` +
+`nlu`), sums the cumulative time of everything imported after interpreter
+start-up, and fails when the total exceeds the budget or when a heavy
+dependency (pandas, numpy, requests) is pulled in. Exit code 1 on failure so
+it can gate CI like `nlu.run_nlu_tests`.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+MARK = "--startup-budget-mark--"
+HEAVY_MODULES = ("pandas", "numpy", "requests")
+TARGETS = {
+    "parse_only": "import query_service, nlu; query_service.parse_only('Education since 2019?')",
+}
+
+
+def measure(code: str) -> Tuple[float, List[str]]:
+    """Return (cumulative import ms after start-up, names of all modules imported) for `code`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; print({MARK!r}, file=sys.stderr); {code}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = proc.stderr.splitlines()
+    lines = lines[lines.index(MARK) + 1:]
+    total_us = 0
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        modules.append(name.strip())
+        # Top-level entries (no indentation) already include their children
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    ok = True
+    for name, code in TARGETS.items():
+        ms, modules = measure(code)
+        heavy = sorted({m.split(".")[0] for m in modules if m.split(".")[0] in HEAVY_MODULES})
+        passed = ms <= args.budget_ms and not heavy
+        ok = ok and passed
+        results[name] = {"import_ms": round(ms, 2), "budget_ms": args.budget_ms, "heavy_imports": heavy, "ok": passed}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, res in results.items():
+            status = "OK  " if res["ok"] else "FAIL"
+            extra = f" (pulled in {', '.join(res['heavy_imports'])})" if res["heavy_imports"] else ""
+            print(f"{status} {name}: {res['import_ms']:.1f} ms of {res['budget_ms']:.0f} ms budget{extra}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
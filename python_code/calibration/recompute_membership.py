@@ -2,39 +2,83 @@
 Utility script to regenerate fuzzy membership parameters.
 
 Usage:
-    python3 -m calibration.recompute_membership
+    python3 -m calibration.recompute_membership [--full] [--rows account_rows.csv]
 
-The script loads cached department totals (or fetches them if absent),
-derives percentile- and MAD-based trapezoids, and overwrites
-`summarizer/label_calibration.json`.
+The script folds department totals into the calibration sketch
+(`summarizer/label_calibration_sketch.npz`: department × year sums, see
+`summarizer.calibration_sketch`), derives percentile- and MAD-based trapezoids
+from it, and overwrites `summarizer/label_calibration.json`.
+
+By default only years missing from the saved sketch are read from the cached
+totals (or fetched if absent), so adding a year does not rescan the history.
+`--rows` reads another CSV instead, e.g. account-level rows with `jahr`, `betrag`
+and `departement`; its years already in the sketch are skipped too, so they are
+not counted twice. `--full` starts from an empty sketch; use it after an already
+folded year was revised.
 """
 
+import argparse
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 from summarizer import (
+    LEVEL_LABELS,
+    TREND_LABELS,
     YEARS,
-    calibrate_level_mfs_from_quantiles,
-    calibrate_trend_mfs_from_mad,
-    compute_share_distribution,
-    compute_trend_distribution,
+    CalibrationSketch,
+    calibrate_from_sketch,
+    label_levels,
+    label_trends,
     load_or_fetch,
 )
-from summarizer.zurich_budget_linguistic_summaries import save_calibration
+from summarizer.zurich_budget_linguistic_summaries import CALIBRATION_SKETCH_PATH, save_calibration, trend_samples
+
+
+def describe_labels(name: str, codes: np.ndarray, labels) -> str:
+    """Summarize how the calibration samples fall into each fuzzy label."""
+    counts = np.bincount(codes, minlength=len(labels)) if codes.size else np.zeros(len(labels), dtype=int)
+    parts = [f"{label} {count / max(codes.size, 1):.0%}" for label, count in zip(labels, counts)]
+    return f"{name} labels over {codes.size} samples: " + ", ".join(parts)
 
 
 def main() -> int:
-    df = load_or_fetch(YEARS)
-    if df.empty:
+    parser = argparse.ArgumentParser(description="Regenerate the fuzzy membership calibration.")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved sketch and fold all rows")
+    parser.add_argument("--rows", type=Path, help="Fold the rows of this CSV instead of the aggregate table")
+    parser.add_argument("--sketch", type=Path, default=CALIBRATION_SKETCH_PATH)
+    args = parser.parse_args()
+
+    sketch = None if args.full else CalibrationSketch.load(args.sketch)
+    if sketch is None:
+        sketch = CalibrationSketch()
+    if args.rows:
+        df = pd.read_csv(args.rows, dtype={"departement": str, "departement_name": str})
+    else:
+        df = load_or_fetch(YEARS)
+    new_rows = df[~df["jahr"].isin(sketch.years)]
+    skipped = sorted(int(y) for y in df["jahr"].unique() if int(y) in sketch.years)
+    if args.rows and skipped:
+        print(f"Skipped years already in the sketch: {skipped} (use --full to refold them)")
+    if new_rows.empty and not sketch.years:
         print("No data available for calibration.")
         return 1
 
-    share_samples = compute_share_distribution(df, spending_only=True)
-    trend_samples = compute_trend_distribution(df, spending_only=True)
-    level_mfs = calibrate_level_mfs_from_quantiles(share_samples)
-    trend_mfs = calibrate_trend_mfs_from_mad(trend_samples)
-    save_calibration(level_mfs, trend_mfs, df)
+    sketch.fold(new_rows)
+    new_years = sorted(int(y) for y in new_rows["jahr"].unique())
+    print(f"Folded {len(new_rows)} rows (years: {new_years or 'none'}) into {args.sketch}")
+    level_mfs, trend_mfs = calibrate_from_sketch(sketch)
+    save_calibration(level_mfs, trend_mfs, source_years=sketch.years)
+    sketch.save(args.sketch)
     cal_path = Path(__file__).resolve().parent.parent / "summarizer" / "label_calibration.json"
     print(f"Regenerated membership functions at {cal_path}")
+    # Sanity check: every sample should land in a sensible mix of labels
+    matrix = sketch.share_matrix()
+    level_codes, _ = label_levels(matrix.shares[matrix.valid], level_mfs)
+    trend_codes, _ = label_trends(trend_samples(matrix.years, matrix.shares), trend_mfs)
+    print(describe_labels("Level", level_codes, LEVEL_LABELS))
+    print(describe_labels("Trend", trend_codes, TREND_LABELS))
     return 0
 
 
@@ -1,5 +1,5 @@
 """NLU helper package."""
 
-from .parser import parse_question
+from .parser import NLUMatcher, canonicalize, get_matcher, parse_question, parse_questions
 
-__all__ = ["parse_question"]
+__all__ = ["NLUMatcher", "canonicalize", "get_matcher", "parse_question", "parse_questions"]
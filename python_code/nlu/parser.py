@@ -1,7 +1,11 @@
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, NamedTuple, Tuple, Optional
 
 UML = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+SPACES_RE = re.compile(r"\s+")
+YEAR_RE = re.compile(r"(19\d{2}|20\d{2})")
+LAST_N_YEARS_RE = re.compile(r"\b(last|letzte|letzten)\s+(\d{1,2})\s+(years|jahre)\b")
 
 BRIEF_PATTERNS = [
     r"\bbrief\b",
@@ -79,11 +83,15 @@ FIELD_PATTERNS = [
     (r"\bfinance\b|\bfinanz(en)?\b", "finance", 0.95),
 ]
 
+# Exact phrases that pin the transport field above the regular patterns
+TRANSPORT_PHRASES = ["public transport", "public transportation", "roads"]
+DIB_DIGITAL_PATTERN = r"\bdigital\b|\bdigitale?\b|\binfrastruktur\b|\binfrastructure\b"
+
 
 def normalize(text: str) -> str:
     t = text.lower().translate(UML)
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
+    t = NON_ALNUM_RE.sub(" ", t)
+    t = SPACES_RE.sub(" ", t).strip()
     return t
 
 
@@ -94,22 +102,182 @@ def has_phrase(t_norm: str, phrase: str) -> bool:
     return needle in haystack
 
 
+class Hit(NamedTuple):
+    """One pattern match: which rule fired, where, and the field/score it votes for."""
+
+    kind: str  # "brief", "detail", "recent", "all", "field", "transport_phrase" or "dib_digital"
+    field: Optional[str]
+    score: float
+    start: int
+    end: int
+
+
+_WORD_START_RE = re.compile(r"\\b[^\W_]")
+_BACKREF_RE = re.compile(r"\\[1-9]")
+
+
+def _split_alternatives(pattern: str) -> Optional[List[str]]:
+    # Split on top-level "|" only, so "(en)?"-style groups stay intact; None when unsure
+    if "[" in pattern:
+        return None
+    parts, depth, current = [], 0, []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            current.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            parts.append("".join(current))
+            current = []
+            i += 1
+            continue
+        current.append(ch)
+        i += 1
+    parts.append("".join(current))
+    return parts
+
+
+def _literal_prefix(alt: str) -> str:
+    # Literal text right after the leading \\b, stopping before any regex syntax or quantified char
+    out = []
+    for i, ch in enumerate(alt[2:], start=2):
+        if ch in ".^$*+?{}[]()|\\":
+            break
+        if alt[i + 1:i + 2] in ("?", "*", "{"):
+            break
+        out.append(ch)
+    return "".join(out)
+
+
+class NLUMatcher:
+    """Every NLU pattern compiled once for a given department vocabulary.
+
+    Pattern alternatives are indexed by their literal prefix (a small keyword
+    automaton). `matched_rules` walks the normalized text once, word start by
+    word start, and only runs an anchored `match` for alternatives whose prefix
+    is present there. Because every alternative is still tried at every word
+    start, overlapping or greedy patterns (e.g. `across.*city`) cannot hide each
+    other and `parse_question` output stays identical to one `re.search` per
+    pattern. Alternatives that are not word-anchored are searched on their own.
+    """
+
+    def __init__(self, field_to_dept: Dict[str, str]):
+        rules: List[Tuple[str, Optional[str], float, str]] = []
+        rules += [("brief", None, 0.0, p) for p in BRIEF_PATTERNS]
+        rules += [("detail", None, 0.0, p) for p in DETAIL_PATTERNS]
+        rules += [("recent", None, 0.0, p) for p in RECENT_PATTERNS]
+        rules += [("all", None, 0.0, p) for p in ALL_INTENT_PATTERNS]
+        rules += [("transport_phrase", "transport", 0.99, rf"\b{re.escape(p)}\b") for p in TRANSPORT_PHRASES]
+        rules += [("field", field, score, p) for p, field, score in FIELD_PATTERNS]
+        rules.append(("dib_digital", "digital infrastructure", 0.0, DIB_DIGITAL_PATTERN))
+        self.rules = rules
+
+        # First character of the literal prefix -> [(prefix, rule id, compiled alternative)]
+        self._by_initial: Dict[str, List[Tuple[str, int, "re.Pattern"]]] = {}
+        self._fallback: List[Tuple[int, "re.Pattern"]] = []
+        for rule_id, (_, _, _, pattern) in enumerate(rules):
+            alternatives = _split_alternatives(pattern)
+            if alternatives is None:
+                self._fallback.append((rule_id, re.compile(pattern)))
+                continue
+            for alt in alternatives:
+                prefix = _literal_prefix(alt) if _WORD_START_RE.match(alt) else ""
+                if prefix and "(?" not in alt and not _BACKREF_RE.search(alt):
+                    self._by_initial.setdefault(prefix[0], []).append((prefix, rule_id, re.compile(alt)))
+                else:
+                    self._fallback.append((rule_id, re.compile(alt)))
+
+        self.dept_names_norm: Dict[str, List[str]] = {}
+        for field_key, dept_name in field_to_dept.items():
+            self.dept_names_norm.setdefault(normalize(dept_name), []).append(field_key)
+
+    def _word_matches(self, t_norm: str):
+        # Normalized text is single-space separated, so word starts are 0 and every char after a space
+        by_initial = self._by_initial
+        pos = 0
+        n = len(t_norm)
+        while pos < n:
+            for prefix, rule_id, compiled in by_initial.get(t_norm[pos], ()):
+                if t_norm.startswith(prefix, pos):
+                    m = compiled.match(t_norm, pos)
+                    if m:
+                        yield rule_id, m
+            nxt = t_norm.find(" ", pos)
+            if nxt < 0:
+                break
+            pos = nxt + 1
+
+    def scan(self, t_norm: str) -> List[Hit]:
+        """Return every rule hit in normalized text (word-anchored hits in text order, then the rest)."""
+        hits: List[Hit] = []
+        for rule_id, m in self._word_matches(t_norm):
+            kind, field, score, _ = self.rules[rule_id]
+            hits.append(Hit(kind, field, score, m.start(), m.end()))
+        for rule_id, pattern in self._fallback:
+            m = pattern.search(t_norm)
+            if m:
+                kind, field, score, _ = self.rules[rule_id]
+                hits.append(Hit(kind, field, score, m.start(), m.end()))
+        return hits
+
+    def matched_rules(self, t_norm: str) -> set:
+        """Ids (indexes into `rules`) of every rule that matches somewhere in normalized text."""
+        ids = {rule_id for rule_id, _ in self._word_matches(t_norm)}
+        for rule_id, pattern in self._fallback:
+            if rule_id not in ids and pattern.search(t_norm):
+                ids.add(rule_id)
+        return ids
+
+
+_MATCHERS: Dict[Tuple[Tuple[str, str], ...], NLUMatcher] = {}
+
+
+def get_matcher(field_to_dept: Optional[Dict[str, str]] = None) -> NLUMatcher:
+    """Return the compiled matcher for this vocabulary, building it on first use."""
+    key = tuple((field_to_dept or {}).items())
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = _MATCHERS[key] = NLUMatcher(dict(key))
+    return matcher
+
+
+def _kinds(matcher: NLUMatcher, rule_ids: set) -> set:
+    return {matcher.rules[i][0] for i in rule_ids}
+
+
 def parse_generalization_level(t_norm: str) -> int:
-    if any(re.search(p, t_norm) for p in BRIEF_PATTERNS):
+    return _generalization_level(_kinds(get_matcher(), get_matcher().matched_rules(t_norm)))
+
+
+def _generalization_level(kinds: set) -> int:
+    if "brief" in kinds:
         return 0
-    if any(re.search(p, t_norm) for p in DETAIL_PATTERNS):
+    if "detail" in kinds:
         return 2
     return 1
 
 
 def parse_timeline(t_norm: str, years_available: List[int], allow_recent_window: bool = True) -> Tuple[object, Optional[int]]:
-    years = sorted(set(int(y) for y in re.findall(r"(19\d{2}|20\d{2})", t_norm)))
+    is_recent = "recent" in _kinds(get_matcher(), get_matcher().matched_rules(t_norm))
+    return _timeline(t_norm, years_available, allow_recent_window, is_recent)
+
+
+def _timeline(
+    t_norm: str, years_available: List[int], allow_recent_window: bool, is_recent: bool
+) -> Tuple[object, Optional[int]]:
+    years = sorted(set(int(y) for y in YEAR_RE.findall(t_norm)))
     since = None
 
     if ("since" in t_norm or "seit" in t_norm or "from" in t_norm) and years:
         since = years[0]
 
-    m = re.search(r"\b(last|letzte|letzten)\s+(\d{1,2})\s+(years|jahre)\b", t_norm)
+    m = LAST_N_YEARS_RE.search(t_norm)
     if m and years_available:
         n = int(m.group(2))
         end = max(years_available)
@@ -118,7 +286,7 @@ def parse_timeline(t_norm: str, years_available: List[int], allow_recent_window:
     if since is None and len(years) >= 2:
         since = min(years)
 
-    if since is None and allow_recent_window and years_available and any(re.search(p, t_norm) for p in RECENT_PATTERNS):
+    if since is None and allow_recent_window and years_available and is_recent:
         end = max(years_available)
         since = max(min(years_available), end - 2)
 
@@ -127,26 +295,28 @@ def parse_timeline(t_norm: str, years_available: List[int], allow_recent_window:
 
 
 def detect_all_intent(t_norm: str) -> bool:
-    return any(re.search(p, t_norm) for p in ALL_INTENT_PATTERNS)
+    return "all" in _kinds(get_matcher(), get_matcher().matched_rules(t_norm))
 
 
 def disambiguate_dib(t_norm: str) -> str:
-    if re.search(r"\bdigital\b|\bdigitale?\b|\binfrastruktur\b|\binfrastructure\b", t_norm):
+    if "dib_digital" in _kinds(get_matcher(), get_matcher().matched_rules(t_norm)):
         return "digital infrastructure"
     return "energy"
 
 
 def parse_field(t_norm: str) -> Tuple[str, float, List[Tuple[str, float]]]:
-    candidates: Dict[str, float] = {}
+    matcher = get_matcher()
+    return _field(matcher, matcher.matched_rules(t_norm))
+
 
-    def _register(field: str, score: float) -> None:
-        candidates[field] = max(score, candidates.get(field, 0.0))
+def _field(matcher: NLUMatcher, rule_ids: set) -> Tuple[str, float, List[Tuple[str, float]]]:
+    candidates: Dict[str, float] = {}
 
-    if has_phrase(t_norm, "public transport") or has_phrase(t_norm, "public transportation") or has_phrase(t_norm, "roads"):
-        _register("transport", 0.99)
-    for pattern, field, score in FIELD_PATTERNS:
-        if re.search(pattern, t_norm):
-            _register(field, score)
+    # Register in declaration order so ties keep the same candidate order as before
+    for rule_id in sorted(rule_ids):
+        kind, field, score, _ = matcher.rules[rule_id]
+        if kind in ("transport_phrase", "field"):
+            candidates[field] = max(score, candidates.get(field, 0.0))
 
     if not candidates:
         return "all", 0.20, [("all", 0.20)]
@@ -165,11 +335,16 @@ def parse_question(
     field_to_dept: Dict[str, str],
     dept_names: List[str],
 ) -> Dict:
-    t_norm = normalize(question)
+    return _parse_normalized(normalize(question), get_matcher(field_to_dept), years_available)
+
+
+def _parse_normalized(t_norm: str, matcher: NLUMatcher, years_available: List[int]) -> Dict:
+    rule_ids = matcher.matched_rules(t_norm)
+    kinds = _kinds(matcher, rule_ids)
 
-    gen = parse_generalization_level(t_norm)
-    is_all = detect_all_intent(t_norm)
-    timeline, _ = parse_timeline(t_norm, years_available, allow_recent_window=not is_all)
+    gen = _generalization_level(kinds)
+    is_all = "all" in kinds
+    timeline, _ = _timeline(t_norm, years_available, not is_all, "recent" in kinds)
 
     def _attach_meta(field: str, confidence: float, candidates: List[Tuple[str, float]]) -> Dict:
         payload = {"timeline": timeline, "field": field, "generalization_level": gen,
@@ -180,20 +355,90 @@ def parse_question(
     if is_all:
         return _attach_meta("all", 0.95, [("all", 0.95)])
 
-    dept_names_norm: Dict[str, List[str]] = {}
-    for field_key, dept_name in field_to_dept.items():
-        dept_names_norm.setdefault(normalize(dept_name), []).append(field_key)
-
-    for dept_norm, fields in dept_names_norm.items():
+    for dept_norm, fields in matcher.dept_names_norm.items():
         if dept_norm and dept_norm in t_norm:
             if len(fields) == 1:
                 return _attach_meta(fields[0], 0.99, [(fields[0], 0.99)])
             if dept_norm == "departement der industriellen betriebe":
-                field = disambiguate_dib(t_norm)
+                field = "digital infrastructure" if "dib_digital" in kinds else "energy"
                 return _attach_meta(field, 0.90, [(field, 0.90)])
 
-    field, conf, hits = parse_field(t_norm)
+    field, conf, hits = _field(matcher, rule_ids)
     if conf < 0.5:
         field = "all"
 
     return _attach_meta(field, conf, hits)
+
+
+def canonicalize(req: dict) -> dict:
+    """Reduce a request to the fields that determine the answer, in one canonical form."""
+    out = {
+        "timeline": req.get("timeline", "all"),
+        "field": req.get("field", "all"),
+        "generalization_level": int(req.get("generalization_level", 1)),
+    }
+    # timeline dict normalization
+    tl = out["timeline"]
+    if isinstance(tl, dict) and "since" in tl:
+        out["timeline"] = {"since": int(tl["since"])}
+    elif isinstance(tl, int):
+        out["timeline"] = {"since": tl}
+    return out
+
+
+def _copy_request(req: Dict) -> Dict:
+    # Requests are small and JSON-shaped; copy the nested parts so callers can mutate freely
+    out = dict(req)
+    if isinstance(out["timeline"], dict):
+        out["timeline"] = dict(out["timeline"])
+    out["field_candidates"] = [dict(c) for c in out["field_candidates"]]
+    return out
+
+
+def _parse_batch(questions: List[str], years_available: List[int], field_to_dept: Dict[str, str]) -> List[Dict]:
+    matcher = get_matcher(field_to_dept)
+    # Replayed logs repeat a lot: parse each distinct normalized text once
+    seen: Dict[str, Dict] = {}
+    out = []
+    for question in questions:
+        t_norm = normalize(question)
+        parsed = seen.get(t_norm)
+        if parsed is None:
+            parsed = seen[t_norm] = _parse_normalized(t_norm, matcher, years_available)
+            out.append(parsed)
+        else:
+            out.append(_copy_request(parsed))
+    return out
+
+
+def _parse_batch_star(args: Tuple[List[str], List[int], Dict[str, str]]) -> List[Dict]:
+    return _parse_batch(*args)
+
+
+def parse_questions(
+    questions: Iterable[str],
+    years_available: List[int],
+    field_to_dept: Dict[str, str],
+    dept_names: List[str],
+    processes: Optional[int] = None,
+    chunk_size: int = 5000,
+) -> List[Dict]:
+    """Parse many utterances at once; results are in input order and equal `parse_question`'s.
+
+    The matcher is compiled once and repeated utterances (after normalization) are
+    parsed once. With `processes` > 1, chunks of `chunk_size` questions are spread
+    over a multiprocessing pool, which pays off for corpora of many thousands.
+    """
+    questions = list(questions)
+    if not processes or processes <= 1 or len(questions) <= chunk_size:
+        return _parse_batch(questions, years_available, field_to_dept)
+
+    import multiprocessing
+
+    chunks = [
+        (questions[i:i + chunk_size], list(years_available), dict(field_to_dept))
+        for i in range(0, len(questions), chunk_size)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.map(_parse_batch_star, chunks)
+    return [req for part in parts for req in part]
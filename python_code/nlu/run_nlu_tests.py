@@ -3,10 +3,10 @@ import sys
 from pathlib import Path
 
 if __package__:
-    from .parser import parse_question
+    from .parser import canonicalize, parse_questions
 else:
     sys.path.append(str(Path(__file__).resolve().parents[1]))
-    from nlu.parser import parse_question  # type: ignore
+    from nlu.parser import canonicalize, parse_questions  # type: ignore
 
 try:
     from summarizer import FIELD_TO_DEPT, YEARS
@@ -26,22 +26,6 @@ except ModuleNotFoundError:
     }
 
 
-def canonicalize(req: dict) -> dict:
-    # ensure consistent format for comparison
-    out = {
-        "timeline": req.get("timeline", "all"),
-        "field": req.get("field", "all"),
-        "generalization_level": int(req.get("generalization_level", 1)),
-    }
-    # timeline dict normalization
-    tl = out["timeline"]
-    if isinstance(tl, dict) and "since" in tl:
-        out["timeline"] = {"since": int(tl["since"])}
-    elif isinstance(tl, int):
-        out["timeline"] = {"since": tl}
-    return out
-
-
 def load_test_set() -> dict:
     test_path = Path(__file__).resolve().parent / "nlu_test_set.json"
     with test_path.open("r", encoding="utf-8") as f:
@@ -54,18 +38,16 @@ def main():
     total = len(items)
     ok = 0
 
-    for it in items:
+    predictions = parse_questions(
+        [it["utterance"] for it in items],
+        years_available=YEARS,
+        field_to_dept=FIELD_TO_DEPT,
+        dept_names=list(FIELD_TO_DEPT.values()),
+    )
+    for it, raw_pred in zip(items, predictions):
         utter = it["utterance"]
         expected = canonicalize(it["expected"])
-
-        pred = canonicalize(
-            parse_question(
-                utter,
-                years_available=YEARS,
-                field_to_dept=FIELD_TO_DEPT,
-                dept_names=list(FIELD_TO_DEPT.values()),
-            )
-        )
+        pred = canonicalize(raw_pred)
 
         if pred == expected:
             ok += 1
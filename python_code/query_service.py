@@ -1,28 +1,215 @@
-"""Bridges natural-language questions with the summarization API."""
+"""Bridges natural-language questions with the summarization API.
 
+The summarizer (pandas/numpy) is imported on first answer, not at import time,
+so parse-only callers start in milliseconds. Answers are memoized on the
+canonical request (many phrasings share one) plus the version of the data and
+calibration of the dataset it targets.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
-from nlu import parse_question
-from summarizer import FIELD_TO_DEPT, YEARS, answer_request
+from nlu import canonicalize, parse_question
+from summarizer import FIELD_TO_DEPT, YEARS, instrument
 
 
-def answer_question(question: str) -> Dict[str, Any]:
-    """Parse a free-text question, run the summarizer, and return metadata.
+class ResponseCache:
+    """Thread-safe LRU with per-entry TTL and hit/miss counters."""
 
-    Note: the returned `response` already embeds the parsed request under `response["request"]`,
-    including any NLU confidence/candidate fields, so we avoid duplicating it at the top level.
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and self._clock() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_ttl = float(os.environ.get("ZRH_RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE = ResponseCache(
+    max_size=int(os.environ.get("ZRH_RESPONSE_CACHE_SIZE", "1024")),
+    ttl_seconds=_ttl if _ttl > 0 else None,
+)
+
+
+def _copy_json(value: Any) -> Any:
+    # Responses are JSON-shaped; this is much cheaper than copy.deepcopy
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def _request_key(parsed_request: Dict) -> Optional[Hashable]:
+    """Canonical, hashable form of the answer-relevant request fields (None = not cacheable)."""
+    try:
+        canon = canonicalize(parsed_request)
+    except (TypeError, ValueError):
+        return None
+    tl = canon["timeline"]
+    timeline = ("since", tl["since"]) if isinstance(tl, dict) else tl
+    field = canon["field"]
+    # Key on the level as given: answer_request compares it without coercion
+    level = parsed_request.get("generalization_level", 1)
+    if not all(isinstance(v, Hashable) for v in (timeline, level)) or not isinstance(field, str):
+        return None
+    dataset = parsed_request.get("dataset")
+    return (None if dataset is None else str(dataset)), timeline, field, type(level).__name__, level
+
+
+def _cached_answers(parsed: List[Dict]) -> List[Dict]:
+    from summarizer import DATASETS, UnknownDataset, answer_requests
+
+    stamps: Dict[Optional[str], Optional[Hashable]] = {}
+
+    def _stamp(dataset: Optional[str]) -> Optional[Hashable]:
+        # One version check per dataset and call; unknown datasets are answered but never cached
+        if dataset not in stamps:
+            try:
+                stamps[dataset] = DATASETS.get(dataset).version_stamp()
+            except UnknownDataset:
+                stamps[dataset] = None
+        return stamps[dataset]
+
+    def _cache_key(req: Dict) -> Optional[Hashable]:
+        key = _request_key(req)
+        stamp = _stamp(key[0]) if key is not None else None
+        return None if stamp is None else (key, stamp)
+
+    responses: List[Optional[Dict]] = []
+    missing: List[int] = []
+    for i, req in enumerate(parsed):
+        key = _cache_key(req)
+        cached = RESPONSE_CACHE.get(key) if key is not None else None
+        instrument.count("response_cache_miss" if cached is None else "response_cache_hit")
+        if cached is None:
+            responses.append(None)
+            missing.append(i)
+        else:
+            # Same canonical request, different phrasing: echo this caller's own request
+            resp = _copy_json(cached)
+            resp["request"] = req
+            responses.append(resp)
+    if missing:
+        for i, resp in zip(missing, answer_requests([parsed[i] for i in missing])):
+            key = _cache_key(parsed[i])
+            if key is not None:
+                RESPONSE_CACHE.put(key, _copy_json(resp))
+            responses[i] = resp
+    return responses
+
+
+def invalidate_caches(dataset: Optional[str] = None) -> None:
+    """Drop memoized answers, the loaded data and windows, and the calibration; the next answer reloads.
+
+    With `dataset`, only that dataset's data and calibration are dropped (answers are all cleared).
     """
-    parsed_request = parse_question(
-        question,
-        years_available=YEARS,
-        field_to_dept=FIELD_TO_DEPT,
-        dept_names=list(FIELD_TO_DEPT.values()),
-    )
-    response = answer_request(parsed_request)
+    from summarizer import DATASETS, clear_calibration_cache
+
+    RESPONSE_CACHE.clear()
+    if dataset is None or dataset == DATASETS.default:
+        clear_calibration_cache()
+    DATASETS.invalidate(dataset)
+
+
+def parse_only(question: str) -> Dict:
+    """Run just the NLU step; never loads the data stack."""
+    return _parse(question)
+
+
+def _parse(question: str) -> Dict:
+    with instrument.stage("parse"):
+        return parse_question(
+            question,
+            years_available=YEARS,
+            field_to_dept=FIELD_TO_DEPT,
+            dept_names=list(FIELD_TO_DEPT.values()),
+        )
+
+
+def _with_dataset(parsed_request: Dict, dataset: Optional[str]) -> Dict:
+    if dataset is not None:
+        parsed_request["dataset"] = dataset
+    return parsed_request
+
+
+def _wrap(question: str, parsed_request: Dict, response: Dict) -> Dict[str, Any]:
     return {
         "raw_question": question,
         "asked_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         "nlu_interpretation": parsed_request,
         "response": response,
     }
+
+
+def answer_question(question: str, dataset: Optional[str] = None) -> Dict[str, Any]:
+    """Parse a free-text question, run the summarizer, and return metadata.
+
+    Note: the returned `response` already embeds the parsed request under `response["request"]`,
+    including any NLU confidence/candidate fields, so we avoid duplicating it at the top level.
+    With instrumentation enabled, per-stage timings are added under `timings`.
+    `dataset` names a registered dataset to answer from (default: the default dataset).
+    """
+    with instrument.trace() as timings:
+        parsed_request = _with_dataset(_parse(question), dataset)
+        response = _cached_answers([parsed_request])[0]
+    result = _wrap(question, parsed_request, response)
+    if timings is not None:
+        result["timings"] = timings.as_dict()
+    return result
+
+
+def answer_questions(questions: List[str], dataset: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Batch variant of `answer_question`: parse everything, then answer in one pass over shared windows."""
+    parsed = [_with_dataset(_parse(q), dataset) for q in questions]
+    responses = _cached_answers(parsed)
+    return [_wrap(q, p, r) for q, p, r in zip(questions, parsed, responses)]
@@ -0,0 +1,204 @@
+"""Long-running JSON-over-HTTP query server.
+
+Keeps data, calibration and the window cube warm in memory so questions are
+answered without paying the Python + pandas start-up cost each time.
+
+Usage:
+    python3 server.py [--host 127.0.0.1] [--port 8765]
+
+Endpoints:
+    GET  /health   -> {"status": "ok", "windows": <precomputed windows>, "data_digest": ...,
+                       "response_cache": {...}, "datasets": {...}}
+    GET  /metrics  -> stage timings and counters in Prometheus text format (with --instrument)
+    POST /ask      {"question": "...", "dataset": "..."}  -> answer_question result
+    POST /request  {"timeline": ..., "field": ..., "dataset": ..., ...} -> answer_request result
+    POST /batch    {"questions": [...], "requests": [...], "dataset": "..."}
+                   -> {"questions": [...], "requests": [...]}, answered in one pass
+    POST /invalidate {"dataset": "..."}                -> reload data and calibration, clear cached answers
+
+"dataset" is optional everywhere and names an entry of the dataset registry
+(`ZRH_DATASETS`); only the default dataset is loaded at startup, the others on
+their first query. In /batch it applies to the questions; requests carry their own.
+"""
+
+import argparse
+import json
+import sys
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from query_service import RESPONSE_CACHE, answer_question, answer_questions, invalidate_caches
+from summarizer import DATASETS, UnknownDataset, answer_request, answer_requests, instrument, validate_request
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _dataset(payload: Dict[str, Any]) -> Optional[str]:
+    dataset = payload.get("dataset")
+    if dataset is not None and not isinstance(dataset, str):
+        raise BadRequest("'dataset' must be a string")
+    return dataset
+
+
+def handle_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    questions = payload.get("questions") or []
+    reqs = payload.get("requests") or []
+    if not isinstance(questions, list) or not isinstance(reqs, list):
+        raise BadRequest("'questions' and 'requests' must be lists")
+    if not all(isinstance(q, str) for q in questions):
+        raise BadRequest("'questions' must contain strings")
+    for i, req in enumerate(reqs):
+        try:
+            validate_request(req)
+        except ValueError as e:
+            raise BadRequest(f"requests[{i}]: {e}")
+    dataset = _dataset(payload)
+    with instrument.trace() as timings:
+        body = {"questions": answer_questions(questions, dataset), "requests": answer_requests(reqs)}
+    if timings is not None:
+        body["timings"] = timings.as_dict()
+    return body
+
+
+def handle_ask(payload: Dict[str, Any]) -> Dict[str, Any]:
+    question = payload.get("question")
+    if not isinstance(question, str) or not question.strip():
+        raise BadRequest("'question' must be a non-empty string")
+    return answer_question(question.strip(), _dataset(payload))
+
+
+def handle_request(payload: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        validate_request(payload)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    return answer_request(payload)
+
+
+def handle_invalidate(payload: Dict[str, Any]) -> Dict[str, Any]:
+    dataset = _dataset(payload)
+    try:
+        invalidate_caches(dataset)
+        # Reload what was being served: the named dataset, or the default one
+        return {"status": "ok", "windows": DATASETS.warm(dataset)}
+    except UnknownDataset:
+        raise BadRequest(f"Unknown dataset '{dataset}'")
+
+
+ROUTES = {
+    "/ask": handle_ask,
+    "/request": handle_request,
+    "/batch": handle_batch,
+    "/invalidate": handle_invalidate,
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ZuriBudgetQuery/1.0"
+    # Headers and body go out in separate writes; without this keep-alive clients hit delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt: str, *args) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise BadRequest("Request body too large")
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            payload = json.loads(raw.decode("utf-8"))
+        except ValueError as e:
+            raise BadRequest(f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise BadRequest("Request body must be a JSON object")
+        return payload
+
+    def _send_text(self, status: int, text: str, content_type: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] == "/metrics":
+            self._send_text(200, instrument.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+            return
+        if self.path.split("?", 1)[0] == "/health":
+            # Report state only: loading or warming here would block on builds and evict datasets
+            datasets = DATASETS.stats()
+            default = datasets["datasets"][datasets["default"]]
+            self._send_json(200, {
+                "status": "ok",
+                "windows": default["windows"],
+                "data_digest": default["data_digest"],
+                "response_cache": RESPONSE_CACHE.stats(),
+                "datasets": datasets,
+            })
+            return
+        self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self) -> None:
+        handler = ROUTES.get(self.path.split("?", 1)[0])
+        if handler is None:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        try:
+            status, body = 200, handler(self._read_json())
+        except BadRequest as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send_json(status, body)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, quiet: bool = False) -> Tuple[ThreadingHTTPServer, int]:
+    """Warm the default dataset and bind the server; returns (server, number of warm windows)."""
+    windows = DATASETS.warm()
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server, windows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve Zurich budget answers over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--quiet", action="store_true", help="Do not log each request")
+    parser.add_argument("--instrument", action="store_true", help="Time pipeline stages (also ZRH_INSTRUMENT=1)")
+    args = parser.parse_args()
+
+    if args.instrument:
+        instrument.enable()
+    server, windows = make_server(args.host, args.port, args.quiet)
+    print(f"Serving on http://{args.host}:{server.server_port} ({windows} timeline windows warm)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
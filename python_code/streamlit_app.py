@@ -1,9 +1,82 @@
 import json
-from typing import List, Dict, Any
+import os
+import urllib.error
+import urllib.request
+from typing import List, Dict, Any, Optional
 
 import streamlit as st
 
-from query_service import answer_question
+import query_service
+
+# Point the dashboard at a running `server.py` instead of answering in-process
+DEFAULT_SERVER_URL = os.environ.get("ZRH_QUERY_SERVER", "")
+
+
+class LocalBackend:
+    """Answers in this process from the shared dataset store, calibration and response cache.
+
+    One instance serves every session: data and windows are loaded once here, not per submit.
+    """
+
+    label = "in-process"
+
+    def __init__(self):
+        from summarizer import DATASET_STORE
+
+        self.store = DATASET_STORE
+        self.windows = self.store.warm()
+
+    def ask(self, question: str) -> Dict[str, Any]:
+        return query_service.answer_question(question)
+
+    def invalidate(self) -> None:
+        query_service.invalidate_caches()
+        self.windows = self.store.warm()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "windows": self.windows,
+            "data_digest": self.store.digest,
+            "response_cache": query_service.RESPONSE_CACHE.stats(),
+        }
+
+
+class ServerBackend:
+    """Forwards questions to a standalone query server (`python3 server.py`)."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url
+        self.label = url
+        self.timeout = timeout
+
+    def _call(self, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        req = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            # 400/500 bodies carry {"error": ...}; show that rather than the bare status line
+            try:
+                detail = json.loads(e.read().decode("utf-8")).get("error")
+            except (OSError, ValueError, AttributeError):
+                detail = None
+            raise OSError(f"HTTP {e.code} from {self.url}{path}: {detail or e.reason}") from e
+
+    def ask(self, question: str) -> Dict[str, Any]:
+        return self._call("/ask", {"question": question})
+
+    def invalidate(self) -> None:
+        self._call("/invalidate", {})
+
+    def status(self) -> Dict[str, Any]:
+        return self._call("/health")
+
+
+@st.cache_resource(show_spinner="Loading budget data...")
+def get_backend(server_url: str):
+    """One backend per server URL for the whole Streamlit process (empty URL = in-process)."""
+    return ServerBackend(server_url) if server_url else LocalBackend()
 
 
 st.set_page_config(page_title="Zürich Budget Q&A", page_icon="💰", layout="wide")
@@ -12,6 +85,32 @@ st.write(
     "Ask a question in natural language to see how the NLU layer interprets it and how the summarizer responds."
 )
 
+with st.sidebar:
+    st.subheader("Backend")
+    server_url = st.text_input(
+        "Query server URL",
+        value=DEFAULT_SERVER_URL,
+        placeholder="http://127.0.0.1:8765",
+        help="Leave empty to answer in this process.",
+    ).strip().rstrip("/")
+    backend = get_backend(server_url)
+    st.caption(f"Answering via: {backend.label}")
+    if st.button("Reload data and clear caches"):
+        try:
+            with st.spinner("Reloading..."):
+                backend.invalidate()
+            st.success("Caches cleared.")
+        except (OSError, ValueError) as e:
+            st.error(f"Invalidation failed: {e}")
+    try:
+        status = backend.status()
+        digest = status.get("data_digest")
+        st.caption(f"Data version: {digest[:12] if digest else 'n/a'} · windows ready: {status.get('windows')}")
+        st.caption("Response cache: " + json.dumps(status.get("response_cache", {})))
+    except (OSError, ValueError) as e:
+        # ValueError: the URL answered with something other than JSON
+        st.error(f"Backend unavailable: {e}")
+
 
 def add_to_history(entry: Dict[str, Any]) -> None:
     history: List[Dict[str, Any]] = st.session_state.setdefault("history", [])
@@ -33,14 +132,19 @@ if submitted:
     if not question:
         st.warning("Please enter a question before submitting.")
     else:
+        result = None
         with st.spinner("Querying summarizer..."):
-            result = answer_question(question)
-        add_to_history(result)
-        st.success("Answer received. Scroll down to inspect details.")
-        resp_msg = (result.get("response") or {}).get("message")
-        if resp_msg:
-            st.markdown("**Answer from server**")
-            st.info(resp_msg)
+            try:
+                result = backend.ask(question)
+            except (OSError, ValueError) as e:
+                st.error(f"Query failed: {e}")
+        if result is not None:
+            add_to_history(result)
+            st.success("Answer received. Scroll down to inspect details.")
+            resp_msg = (result.get("response") or {}).get("message")
+            if resp_msg:
+                st.markdown("**Answer from server**")
+                st.info(resp_msg)
 
 history = st.session_state.get("history", [])
 if history:
@@ -1,31 +1,101 @@
-"""Summarizer package exposing budget aggregation utilities."""
-
-from .zurich_budget_linguistic_summaries import (  # noqa: F401
-    FIELD_TO_DEPT,
-    YEARS,
-    answer_request,
-    calibrate_level_mfs_from_quantiles,
-    calibrate_trend_mfs_from_mad,
-    compute_share_distribution,
-    compute_trend_distribution,
-    ensure_calibration,
-    label_level,
-    label_trend,
-    load_or_fetch,
-    summarize,
-)
+"""Summarizer package exposing budget aggregation utilities.
+
+Only the light constants are imported eagerly; everything backed by pandas/numpy
+is resolved from `zurich_budget_linguistic_summaries` (or `drilldown`) on first
+attribute access, so importing the package (e.g. for the NLU vocabulary) stays cheap.
+"""
+
+import importlib
+
+from .config import FIELD_TO_DEPT, YEARS  # noqa: F401
+
+_LAZY_EXPORTS = {
+    "CalibrationSketch",
+    "DATASETS",
+    "DATASET_STORE",
+    "LEVEL_LABELS",
+    "TREND_LABELS",
+    "UnknownDataset",
+    "DatasetRegistry",
+    "DatasetStore",
+    "ShareMatrix",
+    "answer_request",
+    "answer_request_async",
+    "answer_requests",
+    "calibrate_from_sketch",
+    "calibrate_level_mfs_from_quantiles",
+    "calibrate_trend_mfs_from_mad",
+    "clear_calibration_cache",
+    "compute_share_distribution",
+    "compute_trend_distribution",
+    "ensure_calibration",
+    "label_level",
+    "label_levels",
+    "label_trend",
+    "label_trends",
+    "load_or_fetch",
+    "summarize",
+    "theil_sen_slope",
+    "theil_sen_slopes",
+    "validate_request",
+}
+
+
+_DRILLDOWN_EXPORTS = {
+    "account_drivers",
+    "group_shares",
+    "load_or_fetch_account_rows",
+    "summarize_groups",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS or name in _DRILLDOWN_EXPORTS:
+        source = ".drilldown" if name in _DRILLDOWN_EXPORTS else ".zurich_budget_linguistic_summaries"
+        module = importlib.import_module(source, __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_EXPORTS | _DRILLDOWN_EXPORTS)
+
 
 __all__ = [
+    "CalibrationSketch",
+    "DATASETS",
+    "DATASET_STORE",
     "FIELD_TO_DEPT",
+    "LEVEL_LABELS",
+    "TREND_LABELS",
+    "UnknownDataset",
+    "DatasetRegistry",
+    "DatasetStore",
+    "ShareMatrix",
     "YEARS",
+    "account_drivers",
     "answer_request",
+    "answer_request_async",
+    "answer_requests",
+    "calibrate_from_sketch",
     "calibrate_level_mfs_from_quantiles",
     "calibrate_trend_mfs_from_mad",
+    "clear_calibration_cache",
     "compute_share_distribution",
     "compute_trend_distribution",
     "ensure_calibration",
+    "group_shares",
     "label_level",
+    "label_levels",
     "label_trend",
+    "label_trends",
     "load_or_fetch",
+    "load_or_fetch_account_rows",
     "summarize",
+    "summarize_groups",
+    "theil_sen_slope",
+    "theil_sen_slopes",
+    "validate_request",
 ]
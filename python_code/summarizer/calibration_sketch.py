@@ -0,0 +1,151 @@
+"""Mergeable calibration state: department × year amount sums.
+
+The level calibration needs every department-year share and the trend
+calibration a Theil–Sen slope per department; both follow from the per-cell
+sums alone, so that is what the sketch keeps: spending (positive rows), net
+amount and row count per (department, year). New rows, whether another year of
+the aggregate or a batch of account-level rows, are folded in by adding to
+those cells, and two sketches merge the same way. The quantiles and MAD are then
+exact and cost O(departments × years) instead of a rescan of the raw rows.
+
+A quantile sketch over the share values themselves (t-digest, KLL) would not
+work here: a year's shares all move whenever rows for that year are added,
+since they are relative to the city total.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from .share_matrix import ShareMatrix
+else:
+    from share_matrix import ShareMatrix  # type: ignore
+
+FORMAT_VERSION = 1
+
+
+class CalibrationSketch:
+    """Spending, net amount and row count per (department, year), foldable and mergeable."""
+
+    def __init__(self):
+        self.departments: List[str] = []
+        self.years: List[int] = []
+        self.spending = np.zeros((0, 0))
+        self.net = np.zeros((0, 0))
+        self.rows = np.zeros((0, 0), dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CalibrationSketch":
+        return cls().fold(df)
+
+    def copy(self) -> "CalibrationSketch":
+        out = CalibrationSketch()
+        out.departments, out.years = list(self.departments), list(self.years)
+        out.spending, out.net, out.rows = self.spending.copy(), self.net.copy(), self.rows.copy()
+        return out
+
+    def _indices(self, departments: Iterable[str], years: Iterable[int]) -> Tuple[Dict[str, int], Dict[int, int]]:
+        """Map labels to matrix indices, growing the matrices for unseen departments or years."""
+        d_index = {d: i for i, d in enumerate(self.departments)}
+        y_index = {y: i for i, y in enumerate(self.years)}
+        for d in departments:
+            if d not in d_index:
+                d_index[d] = len(self.departments)
+                self.departments.append(d)
+        for y in years:
+            if y not in y_index:
+                y_index[y] = len(self.years)
+                self.years.append(y)
+        grow = ((0, len(self.departments) - self.net.shape[0]), (0, len(self.years) - self.net.shape[1]))
+        if grow != ((0, 0), (0, 0)):
+            self.spending = np.pad(self.spending, grow)
+            self.net = np.pad(self.net, grow)
+            self.rows = np.pad(self.rows, grow)
+        return d_index, y_index
+
+    def fold(self, df: pd.DataFrame) -> "CalibrationSketch":
+        """Add rows with `jahr`, `betrag` and `departement_name` (or `departement`); returns self."""
+        if df.empty:
+            return self
+        name_col = "departement_name" if "departement_name" in df.columns else "departement"
+        amounts = pd.to_numeric(df["betrag"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+        cells = pd.DataFrame({
+            "d": df[name_col].astype(str).to_numpy(),
+            "y": df["jahr"].astype(np.int64).to_numpy(),
+            "spending": np.where(amounts > 0, amounts, 0.0),
+            "net": amounts,
+            "rows": 1,
+        }).groupby(["d", "y"], sort=False).sum()
+        depts = cells.index.get_level_values("d")
+        years = cells.index.get_level_values("y")
+        d_index, y_index = self._indices(depts.unique(), years.unique().tolist())
+        di = np.fromiter((d_index[d] for d in depts), dtype=np.intp, count=len(cells))
+        yi = np.fromiter((y_index[y] for y in years), dtype=np.intp, count=len(cells))
+        # (department, year) pairs are unique after the group-by, so plain fancy-index adds are safe
+        self.spending[di, yi] += cells["spending"].to_numpy()
+        self.net[di, yi] += cells["net"].to_numpy()
+        self.rows[di, yi] += cells["rows"].to_numpy()
+        return self
+
+    def merge(self, other: "CalibrationSketch") -> "CalibrationSketch":
+        """Add another sketch's cells into this one; returns self."""
+        d_index, y_index = self._indices(other.departments, other.years)
+        di = np.array([d_index[d] for d in other.departments], dtype=np.intp)
+        yi = np.array([y_index[y] for y in other.years], dtype=np.intp)
+        self.spending[np.ix_(di, yi)] += other.spending
+        self.net[np.ix_(di, yi)] += other.net
+        self.rows[np.ix_(di, yi)] += other.rows
+        return self
+
+    def share_matrix(self, spending_only: bool = True) -> ShareMatrix:
+        """Departments × years shares in % of the yearly total, sorted; absent cells are NaN.
+
+        `spending_only` uses the positive rows of each cell, like the `betrag > 0`
+        filter of `compute_share_distribution`; otherwise the net amount.
+        """
+        d_order = np.argsort(np.asarray(self.departments, dtype=object), kind="stable")
+        y_order = np.argsort(np.asarray(self.years), kind="stable")
+        values = (self.spending if spending_only else self.net)[np.ix_(d_order, y_order)]
+        present = (values > 0) if spending_only else (self.rows[np.ix_(d_order, y_order)] > 0)
+        return ShareMatrix(
+            [self.departments[i] for i in d_order],
+            np.asarray(self.years)[y_order],
+            np.where(present, values, np.nan),
+        )
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        with tmp.open("wb") as f:
+            np.savez(
+                f,
+                format=np.array(FORMAT_VERSION),
+                departments=np.asarray(self.departments, dtype=str),
+                years=np.asarray(self.years, dtype=np.int64),
+                spending=self.spending,
+                net=self.net,
+                rows=self.rows,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["CalibrationSketch"]:
+        """Read a saved sketch; None when it is missing, unreadable or from another format version."""
+        try:
+            with np.load(Path(path), allow_pickle=False) as data:
+                if int(data["format"]) != FORMAT_VERSION:
+                    return None
+                out = cls()
+                out.departments = [str(d) for d in data["departments"]]
+                out.years = [int(y) for y in data["years"]]
+                out.spending, out.net, out.rows = data["spending"], data["net"], data["rows"]
+        except (OSError, ValueError, KeyError):
+            return None
+        shape = (len(out.departments), len(out.years))
+        if not out.spending.shape == out.net.shape == out.rows.shape == shape:
+            return None
+        return out
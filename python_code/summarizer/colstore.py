@@ -0,0 +1,202 @@
+"""Columnar binary cache for the aggregate tables.
+
+Each column is one `.npy` file inside a `<name>.cols/` directory, loaded with
+`np.load(mmap_mode="r")`: numeric columns are memory-mapped without parsing,
+text columns are stored as int32 codes plus their distinct values in
+`meta.json`. The CSV stays the interchange format (it is what `--sync` edits
+and what ships in the repo); the store records the CSV's size, mtime and sha1
+and is only used while those still match, so it never serves stale rows.
+
+`write_arrays`/`read_arrays` are the generic layer underneath: named arrays
+plus free-form metadata, also used to share the prepared window cube between
+worker processes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+STORE_SUFFIX = ".cols"
+META_NAME = "meta.json"
+FORMAT_VERSION = 1
+# Set ZRH_COLUMN_STORE=0 to always read the CSV
+ENABLED = os.environ.get("ZRH_COLUMN_STORE", "1") != "0"
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha1()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def store_path(csv_path: Path) -> Path:
+    """Column store directory that shadows `csv_path`."""
+    return Path(csv_path).with_suffix(STORE_SUFFIX)
+
+
+def source_signature(csv_path: Path, digest: Optional[str] = None) -> Dict:
+    st = Path(csv_path).stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+
+
+def write_arrays(arrays: Dict[str, np.ndarray], path: Path, meta: Optional[Dict] = None) -> Path:
+    """Write each array as `<name>.npy` plus `meta.json`; replaces any previous store at `path` atomically."""
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    for name, values in arrays.items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+    meta = dict(meta or {}, format=FORMAT_VERSION, arrays=list(arrays))
+    (tmp / META_NAME).write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    # Directories cannot be replaced in one rename; readers that race the swap find no store and fall back
+    old = path.with_name(f"{path.name}.old-{os.getpid()}")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    if old.exists():
+        shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def read_arrays(path: Path, mmap: bool = True) -> Optional[Tuple[Dict, Dict[str, np.ndarray]]]:
+    """Load a store written by `write_arrays` as `(meta, arrays)`; None if it is missing or unreadable.
+
+    Memory-mapped arrays are read-only and shared through the page cache by every
+    process that maps the same store.
+    """
+    path = Path(path)
+    meta = read_meta(path)
+    if meta is None or "arrays" not in meta:
+        return None
+    try:
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in meta["arrays"]
+        }
+    except (OSError, ValueError):
+        return None
+    return meta, arrays
+
+
+def write_columns(df: pd.DataFrame, path: Path, source: Optional[Dict] = None) -> Path:
+    """Write `df` as one `.npy` per column; replaces any previous store at `path` atomically."""
+    arrays = {}
+    columns = []
+    for i, name in enumerate(df.columns):
+        # Frames built by concatenation can carry numbers in object columns
+        col = df[name].infer_objects()
+        entry = {"name": str(name), "file": f"c{i}.npy", "dtype": str(col.dtype)}
+        if col.dtype.kind in "biuf":
+            values = col.to_numpy()
+        else:
+            # Text: dictionary-encode so the codes can be mapped like any numeric column
+            codes, uniques = pd.factorize(col, use_na_sentinel=True)
+            values = codes.astype(np.int32)
+            entry["categories"] = [str(u) for u in uniques]
+        arrays[f"c{i}"] = values
+        columns.append(entry)
+    return write_arrays(arrays, path, {"rows": int(len(df)), "columns": columns, "source": source})
+
+
+def read_meta(path: Path) -> Optional[Dict]:
+    try:
+        with (Path(path) / META_NAME).open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == FORMAT_VERSION else None
+
+
+def read_columns(path: Path, meta: Optional[Dict] = None, mmap: bool = True, writable: bool = False) -> pd.DataFrame:
+    """Load a store written by `write_columns`; numeric columns stay memory-mapped.
+
+    The maps are read-only unless `writable`, which maps them copy-on-write: edits
+    land in private pages and never reach the store.
+    """
+    path = Path(path)
+    meta = meta or read_meta(path)
+    if meta is None:
+        raise ValueError(f"No column store at {path}")
+    mode = ("c" if writable else "r") if mmap else None
+    data = {}
+    for entry in meta["columns"]:
+        values = np.load(path / entry["file"], mmap_mode=mode, allow_pickle=False)
+        if len(values) != meta["rows"]:
+            raise ValueError(f"Column {entry['name']!r} in {path} has {len(values)} rows, expected {meta['rows']}")
+        if "categories" in entry:
+            lookup = np.asarray(entry["categories"] + [None], dtype=object)
+            # Code -1 (missing) picks the trailing None
+            data[entry["name"]] = pd.Series(lookup[values], copy=False).astype(entry["dtype"])
+        else:
+            data[entry["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _fresh_meta(csv_path: Path) -> Optional[Dict]:
+    meta = read_meta(store_path(csv_path))
+    if meta is None or not meta.get("source"):
+        return None
+    try:
+        st = Path(csv_path).stat()
+    except OSError:
+        return None
+    source = meta["source"]
+    if source.get("size") != st.st_size or source.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    return meta
+
+
+def cached_digest(csv_path: Path) -> Optional[str]:
+    """sha1 of `csv_path` as recorded by an up-to-date store (None if unknown)."""
+    if not ENABLED:
+        return None
+    meta = _fresh_meta(csv_path)
+    return meta["source"].get("sha1") if meta else None
+
+
+def read_table(
+    csv_path: Path,
+    digest: Optional[str] = None,
+    dtype: Optional[Dict] = None,
+    writable: bool = False,
+    build: bool = True,
+) -> Tuple[pd.DataFrame, bool]:
+    """Read the table behind `csv_path`, via its column store when that is current.
+
+    Returns `(frame, from_store)`. Store-backed columns are read-only maps unless
+    `writable` (see `read_columns`). With `build`, a missing or stale store is
+    rebuilt from the parsed CSV so the next load is parse-free; failures there are
+    not fatal. `dtype` is passed to `pd.read_csv` (e.g. to keep code-like columns as text).
+    """
+    csv_path = Path(csv_path)
+    if ENABLED:
+        meta = _fresh_meta(csv_path)
+        if meta is not None:
+            try:
+                return read_columns(store_path(csv_path), meta, writable=writable), True
+            except (OSError, ValueError, KeyError):
+                pass
+    df = pd.read_csv(csv_path, dtype=dtype)
+    if ENABLED and build:
+        try:
+            write_columns(df, store_path(csv_path), source_signature(csv_path, digest or file_digest(csv_path)))
+        except OSError:
+            pass
+    return df, False
+
+
+def write_table(df: pd.DataFrame, csv_path: Path, digest: Optional[str] = None) -> None:
+    """Refresh the store for a CSV that was just written from `df`."""
+    if ENABLED:
+        write_columns(df, store_path(csv_path), source_signature(csv_path, digest or file_digest(csv_path)))
@@ -0,0 +1,37 @@
+"""Dataset constants shared by the summarizer and the NLU layer.
+
+Kept free of heavy imports so callers that only need the vocabulary (e.g. the
+parser) do not pay for pandas/numpy.
+"""
+
+import os
+
+# Override to point at a mirror or a local stand-in server
+API_BASE = os.environ.get("ZRH_API_BASE", "https://api.stadt-zuerich.ch/rpkk-rs/v1")
+# Public API key from https://data.stadt-zuerich.ch/dataset/fd_rpktool
+API_KEY = os.environ.get("ZRH_API_KEY", "vopVcmhIMkeUCf8gQjk1GgU2wK+fKihAdlCl0WKJ")
+
+HEADERS_CANDIDATES = [
+    {"api-key": API_KEY},
+]
+
+YEARS = list(range(2019, 2025))
+# Where the aggregate comes from: empty for the cached CSV (else the API), "api"
+# to always fetch, the path of another aggregate CSV, or "synthetic:key=value,..."
+# for a generated table (see synthetic.py)
+DATA_SOURCE = os.environ.get("ZRH_DATA_SOURCE", "")
+BETRAGS_TYP = "GEMEINDERAT_BESCHLUSS"
+
+# Mapping common English topics to official Zurich department names
+FIELD_TO_DEPT = {
+    "education": "Schul- und Sportdepartement",
+    "healthcare": "Gesundheits- und Umweltdepartement",
+    "transport": "Tiefbau- und Entsorgungsdepartement",
+    "energy": "Departement der Industriellen Betriebe",
+    "digital infrastructure": "Departement der Industriellen Betriebe",
+    "security": "Sicherheitsdepartement",
+    "housing": "Hochbaudepartement",
+    "presidency": "Präsidialdepartement",
+    "administration": "Behörden und Gesamtverwaltung",
+    "finance": "Finanzdepartement",
+}
@@ -0,0 +1,340 @@
+"""Account-level drill-down: keep the raw sachkonto rows and summarize any hierarchy level.
+
+`aggregate_department_totals` collapses every API response to one number per
+department and year. This module keeps the rows instead, in a compact typed
+frame (int16 years, float64 amounts, categorical department/institution/account
+codes), and answers questions such as "which account groups drive the education
+increase" with one group-by engine:
+
+- `group_shares` sums amounts per (group, year) with `np.bincount` over combined
+  category codes and divides by the parent total (the city, or e.g. the
+  department when `within=["departement"]`);
+- `summarize_groups` adds Theil–Sen slopes and fuzzy labels for every group in
+  one vectorized pass;
+- `account_drivers` ranks the accounts behind one department's share trend.
+
+At `by=["departement"]` the numbers match `summarize` on the aggregate table.
+
+Usage:
+    python3 -m summarizer.drilldown education [--since 2021] [--level sachkonto] [-n 5]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from . import colstore
+    from .config import BETRAGS_TYP, DATA_SOURCE, FIELD_TO_DEPT, YEARS
+    from .fetcher import FetchEngine
+    from .synthetic import generate_account_rows, is_synthetic, parse_spec
+    from .zurich_budget_linguistic_summaries import (
+        FETCH_ENGINE,
+        LEVEL_LABELS,
+        TREND_LABELS,
+        _fetch_sachkonto2_cell,
+        ensure_calibration,
+        get_departments,
+        label_levels,
+        label_trends,
+        theil_sen_slopes,
+    )
+else:
+    import colstore  # type: ignore
+    from config import BETRAGS_TYP, DATA_SOURCE, FIELD_TO_DEPT, YEARS  # type: ignore
+    from fetcher import FetchEngine  # type: ignore
+    from synthetic import generate_account_rows, is_synthetic, parse_spec  # type: ignore
+    from zurich_budget_linguistic_summaries import (  # type: ignore
+        FETCH_ENGINE,
+        LEVEL_LABELS,
+        TREND_LABELS,
+        _fetch_sachkonto2_cell,
+        ensure_calibration,
+        get_departments,
+        label_levels,
+        label_trends,
+        theil_sen_slopes,
+    )
+
+ACCOUNT_ROWS_NAME = "zrh_budget_account_rows.csv"
+# Hierarchy, coarsest first
+HIERARCHY = ("departement", "institution", "sachkonto")
+ROW_COLUMNS = ["jahr", "betrag", "departement_key", "departement", "institution", "sachkonto"]
+# Account and institution identifiers are codes, not numbers ("030" must stay "030")
+_CSV_DTYPES = {"departement": str, "institution": str, "sachkonto": str}
+GROUP_SUMMARY_COLUMNS = [
+    "first_year", "last_year", "share_first_pct", "share_last_pct", "slope_pp_per_year",
+    "slope_pct_of_mean", "level_label", "level_mu", "trend_label", "trend_mu", "sentence",
+]
+
+
+def _categorical(values) -> pd.Categorical:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.array if isinstance(values, pd.Series) else values
+    # Sorted categories, so code order is name order everywhere below
+    return pd.Categorical(pd.Series(values).astype(str))
+
+
+def compact_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize raw rows to the compact typed layout (`ROW_COLUMNS`); cheap if already compact."""
+    return pd.DataFrame({
+        "jahr": df["jahr"].to_numpy(dtype=np.int16),
+        "betrag": pd.to_numeric(df["betrag"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64),
+        "departement_key": df["departement_key"].to_numpy(dtype=np.int32),
+        "departement": _categorical(df["departement"]),
+        "institution": _categorical(df["institution"]),
+        "sachkonto": _categorical(df["sachkonto"]),
+    })
+
+
+def fetch_account_rows(years: List[int], engine: Optional[FetchEngine] = None) -> pd.DataFrame:
+    """Fetch every (department, year) cell and keep all of its sachkonto/institution rows."""
+    engine = engine or FETCH_ENGINE
+    depts = get_departments(engine)
+    dept_rows = [(int(row["key"]), row["bezeichnung"]) for _, row in depts.iterrows()]
+    cells = [(dept_key, y) for dept_key, _ in dept_rows for y in years]
+    fetched = engine.map(lambda cell: _fetch_sachkonto2_cell(cell[0], cell[1], BETRAGS_TYP, engine), cells)
+    names = dict(dept_rows)
+    frames = []
+    for (dept_key, _), df in zip(cells, fetched):
+        if df is None or df.empty:
+            continue
+        frames.append(pd.DataFrame({
+            "jahr": df["jahr"],
+            "betrag": df["betrag"],
+            "departement_key": dept_key,
+            "departement": names[dept_key],
+            "institution": df["institution"].astype(str),
+            "sachkonto": df["sachkonto"].astype(str),
+        }))
+    if not frames:
+        raise RuntimeError("No data retrieved. Check API key/header or years.")
+    return compact_rows(pd.concat(frames, ignore_index=True))
+
+
+def find_account_rows_csv() -> Optional[Path]:
+    """Return the cached raw-row CSV (working dir first, then package root)."""
+    for csv_path in (Path(ACCOUNT_ROWS_NAME), Path(__file__).resolve().parents[1] / ACCOUNT_ROWS_NAME):
+        if csv_path.exists():
+            return csv_path.resolve()
+    return None
+
+
+def save_account_rows(rows: pd.DataFrame, csv_path: Optional[Path] = None) -> Path:
+    """Write the raw rows as CSV plus its column store (loaded memory-mapped next time)."""
+    csv_path = Path(csv_path or ACCOUNT_ROWS_NAME)
+    rows.to_csv(csv_path, index=False)
+    colstore.write_table(rows, csv_path)
+    return csv_path
+
+
+def load_or_fetch_account_rows(
+    years: List[int], engine: Optional[FetchEngine] = None, source: Optional[str] = None
+) -> pd.DataFrame:
+    """Load the cached raw rows if present, otherwise fetch and cache them.
+
+    A "synthetic:..." `source` (default `ZRH_DATA_SOURCE`) generates them instead.
+    """
+    source = DATA_SOURCE if source is None else source
+    if is_synthetic(source):
+        return generate_account_rows(parse_spec(source))
+    csv_path = find_account_rows_csv()
+    if csv_path is not None:
+        return compact_rows(colstore.read_table(csv_path, dtype=_CSV_DTYPES)[0])
+    rows = fetch_account_rows(years, engine)
+    save_account_rows(rows)
+    return rows
+
+
+class GroupShares(NamedTuple):
+    keys: pd.DataFrame  # one row per group, the `by` columns
+    years: np.ndarray  # sorted years as float (ready for `theil_sen_slopes`)
+    amounts: np.ndarray  # groups × years sums; NaN where the cell is absent (or not spending)
+    shares: np.ndarray  # groups × years, percent of the parent total
+
+
+def _codes(col: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(dtype=np.int64), np.asarray(col.cat.categories)
+    codes, uniques = pd.factorize(col, sort=True)
+    return codes.astype(np.int64), np.asarray(uniques)
+
+
+def group_shares(
+    rows: pd.DataFrame,
+    by: Sequence[str],
+    within: Optional[Sequence[str]] = None,
+    spending_only: bool = True,
+    since_year: Optional[int] = None,
+) -> GroupShares:
+    """Sum `betrag` per group and year and express it as a share of its parent.
+
+    `by` lists the grouping columns (e.g. `["departement", "sachkonto"]`); the parent
+    is the whole city unless `within` names a coarser grouping (a subset of `by`).
+    With `spending_only`, group-years whose sum is not positive drop out of both the
+    group and its parent total, mirroring `summarize` at department level.
+    """
+    by = list(by)
+    within = list(within or [])
+    if not set(within) <= set(by):
+        raise ValueError(f"'within' {within} must be a subset of 'by' {by}")
+    if since_year is not None:
+        rows = rows[rows["jahr"] >= since_year]
+    if rows.empty:
+        empty_keys = pd.DataFrame({c: pd.Series(dtype=object) for c in by})
+        return GroupShares(empty_keys, np.empty(0), np.empty((0, 0)), np.empty((0, 0)))
+
+    # Combine the category codes of the `by` columns into one integer key per row
+    code_cols, categories = [], []
+    for c in by:
+        codes, cats = _codes(rows[c])
+        code_cols.append(codes)
+        categories.append(cats)
+    flat = np.ravel_multi_index(code_cols, [max(len(c), 1) for c in categories])
+    group_flat, gid = np.unique(flat, return_inverse=True)
+    year_codes, year_values = pd.factorize(rows["jahr"], sort=True)
+    n_groups, n_years = len(group_flat), len(year_values)
+
+    cell = gid * n_years + year_codes
+    betrag = rows["betrag"].to_numpy(dtype=np.float64)
+    amounts = np.bincount(cell, weights=betrag, minlength=n_groups * n_years).reshape(n_groups, n_years)
+    present = np.bincount(cell, minlength=n_groups * n_years).reshape(n_groups, n_years) > 0
+    valid = present & (amounts > 0) if spending_only else present
+    amounts = np.where(valid, amounts, np.nan)
+
+    group_codes = np.unravel_index(group_flat, [max(len(c), 1) for c in categories])
+    keys = pd.DataFrame({c: cats[codes] for c, cats, codes in zip(by, categories, group_codes)})
+
+    if within:
+        parent_flat = np.ravel_multi_index(
+            [group_codes[by.index(c)] for c in within], [max(len(categories[by.index(c)]), 1) for c in within]
+        )
+        _, pid = np.unique(parent_flat, return_inverse=True)
+    else:
+        pid = np.zeros(n_groups, dtype=np.int64)
+    parent = np.zeros((pid.max() + 1, n_years))
+    np.add.at(parent, pid, np.nan_to_num(amounts))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = amounts / parent[pid] * 100.0
+    return GroupShares(keys, np.asarray(year_values, dtype=float), amounts, shares)
+
+
+def summarize_groups(
+    rows: pd.DataFrame,
+    by: Sequence[str],
+    within: Optional[Sequence[str]] = None,
+    since_year: Optional[int] = None,
+    spending_only: bool = True,
+    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+) -> pd.DataFrame:
+    """Shares, Theil–Sen slopes and fuzzy labels for every group at the `by` level.
+
+    Labels use the department-level calibration unless other membership functions
+    are given; finer levels have smaller shares, so pass level-specific ones when
+    the low/medium/high wording matters.
+    """
+    by = list(by)
+    gs = group_shares(rows, by, within, spending_only, since_year)
+    valid = ~np.isnan(gs.shares)
+    has_any = valid.any(axis=1) if gs.shares.size else np.zeros(len(gs.keys), dtype=bool)
+    if not has_any.any():
+        return pd.DataFrame(columns=by + GROUP_SUMMARY_COLUMNS)
+    keys = gs.keys[has_any].reset_index(drop=True)
+    shares, valid = gs.shares[has_any], valid[has_any]
+    rows_idx = np.arange(len(shares))
+    n_years = shares.shape[1]
+    first = valid.argmax(axis=1)
+    last = n_years - 1 - valid[:, ::-1].argmax(axis=1)
+    share_first, share_last = shares[rows_idx, first], shares[rows_idx, last]
+
+    slopes = theil_sen_slopes(gs.years, shares)
+    mean_level = np.nanmean(shares, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope_pct_of_mean = np.where(mean_level == 0, 0.0, slopes / mean_level * 100.0)
+    if level_mfs is None or trend_mfs is None:
+        cal_level, cal_trend = ensure_calibration()
+        level_mfs, trend_mfs = level_mfs or cal_level, trend_mfs or cal_trend
+    level_codes, level_mus = label_levels(share_last, level_mfs)
+    trend_codes, trend_mus = label_trends(slope_pct_of_mean, trend_mfs)
+
+    years = gs.years.astype(int)
+    out = keys.copy()
+    out["first_year"] = years[first]
+    out["last_year"] = years[last]
+    out["share_first_pct"] = share_first
+    out["share_last_pct"] = share_last
+    out["slope_pp_per_year"] = slopes
+    out["slope_pct_of_mean"] = slope_pct_of_mean
+    out["level_label"] = np.asarray(LEVEL_LABELS, dtype=object)[level_codes]
+    out["level_mu"] = level_mus
+    out["trend_label"] = np.asarray(TREND_LABELS, dtype=object)[trend_codes]
+    out["trend_mu"] = trend_mus
+    names = [" / ".join(str(v) for v in key) for key in keys.itertuples(index=False)]
+    out["sentence"] = [
+        f"{name}: share is {lvl.upper()} and {trd.upper()} "
+        f"({s:+.2f} pp/yr; {y0}→{y1}: {a:.2f}%→{b:.2f}%)."
+        for name, lvl, trd, s, y0, y1, a, b in zip(
+            names, out["level_label"], out["trend_label"], slopes,
+            out["first_year"], out["last_year"], share_first, share_last,
+        )
+    ]
+    return out.sort_values(["last_year", "share_last_pct"], ascending=[False, False], kind="mergesort")
+
+
+def account_drivers(
+    rows: pd.DataFrame,
+    departement: str,
+    level: str = "sachkonto",
+    since_year: Optional[int] = None,
+    n: int = 5,
+    increasing: bool = True,
+) -> pd.DataFrame:
+    """Accounts (or institutions) whose city-wide share moved most inside one department.
+
+    Shares are taken against the city total, so each row's slope is that account's
+    contribution, in percentage points per year, to the department's own share trend.
+    """
+    if level not in HIERARCHY[1:]:
+        raise ValueError(f"level must be one of {HIERARCHY[1:]}")
+    table = summarize_groups(rows, ["departement", level], since_year=since_year)
+    table = table[table["departement"] == departement]
+    return table.sort_values("slope_pp_per_year", ascending=not increasing, kind="mergesort").head(n)
+
+
+def _resolve_departement(query: str, available: List[str]) -> Optional[str]:
+    name = FIELD_TO_DEPT.get(query.strip().lower(), query)
+    q = name.strip().lower()
+    for dept in available:
+        if dept.lower() == q:
+            return dept
+    matches = [d for d in available if q in d.lower()]
+    return matches[0] if len(matches) == 1 else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rank the account groups behind a department's share trend.")
+    parser.add_argument("field", help="Field key (e.g. education) or department name")
+    parser.add_argument("--since", type=int, default=None, help="First year of the window")
+    parser.add_argument("--level", default="sachkonto", choices=HIERARCHY[1:])
+    parser.add_argument("-n", type=int, default=5, help="Rows per direction")
+    args = parser.parse_args()
+
+    rows = load_or_fetch_account_rows(YEARS)
+    dept = _resolve_departement(args.field, list(rows["departement"].cat.categories))
+    if dept is None:
+        print(f"No department matches {args.field!r}.", file=sys.stderr)
+        return 1
+    for title, increasing in (("Driving the increase", True), ("Driving the decrease", False)):
+        print(f"=== {title}: {dept} ===")
+        for s in account_drivers(rows, dept, args.level, args.since, args.n, increasing)["sentence"]:
+            print("- " + s)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
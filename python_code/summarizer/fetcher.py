@@ -0,0 +1,242 @@
+"""Concurrent, rate-limited HTTP fetching for the rpkk-rs budget API.
+
+All requests go through one keep-alive `requests.Session` shared by a thread
+pool. A global token bucket replaces the old per-request `time.sleep(0.2)`, and
+transient failures (connection errors, 429, 5xx) are retried with exponential
+backoff. With an `HttpCache`, stored responses are revalidated with conditional
+requests and 304s are served from disk. `AsyncFetchEngine` exposes the same engine to asyncio code and
+`SingleFlight` coalesces concurrent async loads of the same thing. The module
+has no pandas dependency so it can be reused by other fetch paths.
+"""
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, TypeVar
+
+if __package__:
+    from . import instrument
+    from .http_cache import HttpCache
+else:
+    import instrument  # type: ignore
+    from http_cache import HttpCache  # type: ignore
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Defaults keep the previous politeness level (one request every 0.2 s)
+DEFAULT_RATE_PER_SEC = float(os.environ.get("ZRH_API_RATE", "5"))
+DEFAULT_MAX_WORKERS = int(os.environ.get("ZRH_API_WORKERS", "8"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchEngine:
+    """Pooled GET client with a global rate limit, header fallback and retry/backoff."""
+
+    def __init__(
+        self,
+        headers_candidates: List[Dict[str, str]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate_per_sec: Optional[float] = DEFAULT_RATE_PER_SEC,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 20.0,
+        cache: Optional[HttpCache] = None,
+    ):
+        self.headers_candidates = headers_candidates
+        self.max_workers = max(1, int(max_workers))
+        self.limiter = TokenBucket(rate_per_sec, burst) if rate_per_sec else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.request_count = 0
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                try:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                except ImportError:
+                    raise RuntimeError(
+                        "The 'requests' package is not installed; cannot fetch from API. "
+                        "Use local CSV or install requests."
+                    )
+                session = requests.Session()
+                # One pooled connection per worker so keep-alive is never starved
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _sleep_before_retry(self, attempt: int, resp=None) -> None:
+        delay = self.backoff * (2 ** attempt)
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        time.sleep(delay + random.uniform(0, self.backoff / 2))
+
+    def get(self, url: str, params: Dict = None):
+        """GET `url`, trying each header style and retrying transient failures."""
+        # The session reports a missing `requests` package; only then is it safe to import
+        session = self.session
+        import requests
+
+        last_exc = None
+        cached = self.cache.lookup(url, params) if self.cache is not None else None
+        conditional = self.cache.conditional_headers(cached[0]) if cached is not None else {}
+        for headers in self.headers_candidates:
+            for attempt in range(self.max_retries + 1):
+                if self.limiter is not None:
+                    self.limiter.acquire()
+                with self._lock:
+                    self.request_count += 1
+                instrument.count("api_requests")
+                if attempt:
+                    instrument.count("api_retries")
+                try:
+                    resp = session.get(url, headers={**headers, **conditional}, params=params, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    last_exc = e
+                    if attempt < self.max_retries:
+                        self._sleep_before_retry(attempt)
+                        continue
+                    break
+                if resp.status_code == 200:
+                    if self.cache is not None:
+                        self.cache.store(url, params, resp)
+                    return resp
+                if resp.status_code == 304 and cached is not None:
+                    return self.cache.revalidated_response(url, params, cached)
+                # If unauthorized, try the next header style
+                if resp.status_code in (401, 403):
+                    last_exc = RuntimeError(f"Unauthorized with headers {headers.keys()}")
+                    break
+                if resp.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    self._sleep_before_retry(attempt, resp)
+                    continue
+                # Propagate other HTTP errors
+                try:
+                    resp.raise_for_status()
+                except Exception as e:
+                    last_exc = e
+                break
+        if last_exc:
+            raise last_exc
+        raise RuntimeError("HTTP request failed with no further detail.")
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Apply `fn` concurrently and return results in input order."""
+        items = list(items)
+        with instrument.stage("api_fetch"):
+            if self.max_workers == 1 or len(items) <= 1:
+                return [fn(item) for item in items]
+            # Each task runs in a copy of the caller's context so counters reach the caller's trace
+            contexts = [contextvars.copy_context() for _ in items]
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+                return list(pool.map(lambda ctx, item: ctx.run(fn, item), contexts, items))
+
+
+class AsyncFetchEngine:
+    """asyncio front end for a `FetchEngine`: each GET runs on one of the engine's worker threads.
+
+    Session, token bucket and retry policy are the engine's, so sync and async callers
+    share one rate limit; the event loop itself never blocks on the network.
+    """
+
+    def __init__(self, engine: FetchEngine):
+        self.engine = engine
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.engine.max_workers, thread_name_prefix="zrh-fetch")
+            return self._pool
+
+    async def get(self, url: str, params: Dict = None):
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so counters reach the caller's trace
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor(), ctx.run, self.engine.get, url, params)
+
+    async def map(self, fn: Callable[[T], Awaitable[R]], items: Iterable[T]) -> List[R]:
+        """Await `fn` over all items concurrently and return results in input order."""
+        with instrument.stage("api_fetch"):
+            return list(await asyncio.gather(*(fn(item) for item in items)))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls by key: while one call runs, later callers await its result.
+
+    The shared call is shielded, so a cancelled caller does not cancel it for the others;
+    errors reach every waiter and the next call after completion starts afresh.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        # Futures belong to one event loop; keying on it keeps separate loops apart
+        slot = (asyncio.get_running_loop(), key)
+        fut = self._inflight.get(slot)
+        if fut is None or fut.done():
+            fut = asyncio.ensure_future(fn())
+            self._inflight[slot] = fut
+            fut.add_done_callback(lambda done: self._forget(slot, done))
+        else:
+            instrument.count("single_flight_joined")
+        return await asyncio.shield(fut)
+
+    def _forget(self, slot: Hashable, fut: "asyncio.Future") -> None:
+        if self._inflight.get(slot) is fut:
+            del self._inflight[slot]
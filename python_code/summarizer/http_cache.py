@@ -0,0 +1,201 @@
+"""On-disk HTTP response cache with conditional revalidation for `FetchEngine`.
+
+Responses carrying an `ETag` or `Last-Modified` header are stored under a key
+derived from the URL and query parameters (never the auth headers). The next
+GET for the same key sends `If-None-Match`/`If-Modified-Since`; a `304 Not
+Modified` is answered from disk, so refreshing unchanged department-years costs
+one empty round trip instead of a download.
+
+The directory is bounded by size: when a store pushes it past `max_bytes`, the
+least recently used entries (by file mtime, bumped on every hit) are deleted.
+Writes are atomic renames, so concurrent workers and processes can share it.
+
+    ZRH_HTTP_CACHE=0            disable
+    ZRH_HTTP_CACHE_DIR=path     location (default: `.http_cache/` in the package root)
+    ZRH_HTTP_CACHE_MB=256       size bound
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+if __package__:
+    from . import instrument
+else:
+    import instrument  # type: ignore
+
+ENABLED = os.environ.get("ZRH_HTTP_CACHE", "1") != "0"
+DEFAULT_DIR = Path(os.environ.get("ZRH_HTTP_CACHE_DIR", Path(__file__).resolve().parents[1] / ".http_cache"))
+DEFAULT_MAX_BYTES = int(float(os.environ.get("ZRH_HTTP_CACHE_MB", "256")) * 1024 * 1024)
+ENTRY_SUFFIX = ".http"
+
+
+class CachedResponse:
+    """The subset of `requests.Response` that callers use, rebuilt from a cache entry."""
+
+    status_code = 200
+    ok = True
+    from_cache = True
+
+    def __init__(self, url: str, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class HttpCache:
+    """Size-bounded directory of revalidatable GET responses, one file per URL + params."""
+
+    def __init__(self, directory: Path = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.revalidated = 0
+        self.stored = 0
+        self.evicted = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return hashlib.sha1(json.dumps([url, items]).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / (key + ENTRY_SUFFIX)
+
+    def lookup(self, url: str, params: Optional[Dict] = None) -> Optional[Tuple[Dict, bytes]]:
+        """Return `(meta, body)` of the stored response, or None."""
+        path = self._path(self.key(url, params))
+        try:
+            with path.open("rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def conditional_headers(self, meta: Dict) -> Dict[str, str]:
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def revalidated_response(self, url: str, params: Optional[Dict], entry: Tuple[Dict, bytes]) -> CachedResponse:
+        """Serve a 304 from disk and mark the entry as recently used."""
+        meta, body = entry
+        try:
+            os.utime(self._path(self.key(url, params)))
+        except OSError:
+            pass
+        with self._lock:
+            self.revalidated += 1
+        instrument.count("http_cache_revalidated")
+        instrument.count("http_cache_bytes_saved", len(body))
+        return CachedResponse(url, {"Content-Type": meta.get("content_type", "application/json")}, body)
+
+    def store(self, url: str, params: Optional[Dict], resp) -> None:
+        """Keep a 200 response that can be revalidated later; others are ignored."""
+        if self.max_bytes <= 0:
+            return
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": resp.headers.get("Content-Type", "application/json"),
+        }
+        data = json.dumps(meta).encode("utf-8") + b"\n" + resp.content
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(self.key(url, params))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self.stored += 1
+            if self._size is not None:
+                self._size += len(data) - replaced
+        instrument.count("http_cache_stored")
+        if self._current_size() > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        out = []
+        for path in self.directory.glob(f"*/*{ENTRY_SUFFIX}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _current_size(self) -> int:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            return self._size
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the directory fits `max_bytes`; returns how many."""
+        with self._lock:
+            # Rescan: other processes may have added or removed entries
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._size = total
+            self.evicted += removed
+        instrument.count("http_cache_evicted", removed)
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> Dict:
+        return {
+            "directory": str(self.directory),
+            "bytes": self._current_size(),
+            "max_bytes": self.max_bytes,
+            "revalidated": self.revalidated,
+            "stored": self.stored,
+            "evicted": self.evicted,
+        }
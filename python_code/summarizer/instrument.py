@@ -0,0 +1,173 @@
+"""Opt-in hot-path instrumentation: per-stage timers and event counters.
+
+Disabled by default. Enable with `ZRH_INSTRUMENT=1`, `enable()` or the server's
+`--instrument` flag. While enabled:
+
+- `stage("summarize")` times a block, `count("api_requests")` bumps a counter;
+- inside `trace()` both also land on that request's `Trace`, which
+  `answer_request`/`answer_question` attach to their output under `timings`;
+- everything accumulates process-wide for `render_prometheus()` (server `GET /metrics`).
+
+Stages may nest (`build_window` contains `summarize`), so per-stage times can add
+up to more than `total_ms`. Disabled, `stage` returns a shared no-op context
+manager and `count` returns immediately. Standard library only, so the parse-only
+import path stays light.
+"""
+
+import contextvars
+import numbers
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+ENABLED = os.environ.get("ZRH_INSTRUMENT", "0") == "1"
+METRIC_PREFIX = "zrh"
+
+_NOOP = nullcontext()
+_CURRENT: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("zrh_trace", default=None)
+_registry_lock = threading.Lock()
+_stage_totals: Dict[str, List[float]] = {}  # stage -> [calls, seconds]
+_counter_totals: Dict[str, float] = {}
+
+
+def enable(on: bool = True) -> None:
+    global ENABLED
+    ENABLED = on
+
+
+class Trace:
+    """Timings and counters collected for one request (thread-safe: fetch workers report into it)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        self.stages: Dict[str, List[float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def add_count(self, name: str, n: float) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> Dict:
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        with self._lock:
+            return {
+                "total_ms": round(elapsed * 1000.0, 3),
+                "stages": {k: {"ms": round(v[1] * 1000.0, 3), "calls": int(v[0])} for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.t0
+        current = _CURRENT.get()
+        if current is not None:
+            current.add_stage(self.name, seconds)
+        with _registry_lock:
+            entry = _stage_totals.setdefault(self.name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        return False
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage (a no-op while disabled)."""
+    if not ENABLED:
+        return _NOOP
+    return _Stage(name)
+
+
+def count(name: str, n: float = 1) -> None:
+    """Add `n` to the event counter `name` (a no-op while disabled)."""
+    if not ENABLED:
+        return
+    current = _CURRENT.get()
+    if current is not None:
+        current.add_count(name, n)
+    with _registry_lock:
+        _counter_totals[name] = _counter_totals.get(name, 0) + n
+
+
+@contextmanager
+def trace() -> Iterator[Optional[Trace]]:
+    """Collect one request's timings; yields None when disabled or already inside a trace.
+
+    Only the outermost caller gets the Trace (and attaches it); nested calls still
+    report their stages into it.
+    """
+    if not ENABLED or _CURRENT.get() is not None:
+        yield None
+        return
+    current = Trace()
+    token = _CURRENT.set(current)
+    try:
+        yield current
+    finally:
+        _CURRENT.reset(token)
+        current.elapsed = time.perf_counter() - current.started
+
+
+def reset() -> None:
+    """Clear the process-wide totals (per-request traces are unaffected)."""
+    with _registry_lock:
+        _stage_totals.clear()
+        _counter_totals.clear()
+
+
+def snapshot() -> Dict:
+    with _registry_lock:
+        return {
+            "stages": {k: {"calls": int(v[0]), "seconds": v[1]} for k, v in _stage_totals.items()},
+            "counters": dict(_counter_totals),
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(value) -> str:
+    # Integers print exactly; `repr` keeps every digit of a float (`:g` rounds to 6)
+    return str(int(value)) if isinstance(value, numbers.Integral) else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Process-wide totals in the Prometheus text exposition format (version 0.0.4)."""
+    snap = snapshot()
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_seconds Time spent per pipeline stage.",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds summary",
+    ]
+    for name, entry in sorted(snap["stages"].items()):
+        label = f'{{stage="{_label(name)}"}}'
+        lines.append(f"{METRIC_PREFIX}_stage_seconds_sum{label} {entry['seconds']:.9f}")
+        lines.append(f"{METRIC_PREFIX}_stage_seconds_count{label} {entry['calls']}")
+    lines += [
+        f"# HELP {METRIC_PREFIX}_events_total Pipeline events (cache hits, rows processed, API calls).",
+        f"# TYPE {METRIC_PREFIX}_events_total counter",
+    ]
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f'{METRIC_PREFIX}_events_total{{event="{_label(name)}"}} {_sample(value)}')
+    lines.append(f"# HELP {METRIC_PREFIX}_instrumentation_enabled Whether instrumentation is on.")
+    lines.append(f"# TYPE {METRIC_PREFIX}_instrumentation_enabled gauge")
+    lines.append(f"{METRIC_PREFIX}_instrumentation_enabled {int(ENABLED)}")
+    return "\n".join(lines) + "\n"
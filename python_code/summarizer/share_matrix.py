@@ -0,0 +1,90 @@
+"""Department × year share matrix shared by summaries, window slopes and calibration.
+
+Every consumer of department shares needs the same thing: each department's
+amount as a percentage of that year's total. `ShareMatrix` computes it once per
+table as a dense array (absent cells are NaN), together with the yearly totals,
+a validity mask and label → index maps, instead of each caller filtering,
+grouping and merging its own copy of the rows.
+
+A timeline window only drops whole years, so the yearly totals (and with them
+every share) of the years it keeps are unchanged: `since` slices the matrix of
+the full table rather than recomputing it.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ShareMatrix:
+    """Amounts, yearly totals and shares in % per (department, year), departments and years sorted."""
+
+    def __init__(
+        self,
+        departments: Sequence[str],
+        years,
+        amounts: np.ndarray,
+        totals: Optional[np.ndarray] = None,
+    ):
+        self.departments: List[str] = list(departments)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=float).reshape(len(self.departments), len(self.years))
+        self.totals = np.nansum(self.amounts, axis=0) if totals is None else np.asarray(totals, dtype=float)
+        self.valid = ~np.isnan(self.amounts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.shares = (self.amounts / self.totals) * 100.0
+        self.dept_index: Dict[str, int] = {d: i for i, d in enumerate(self.departments)}
+        self.year_index: Dict[int, int] = {int(y): i for i, y in enumerate(self.years)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, spending_only: bool = True) -> "ShareMatrix":
+        """Pivot rows with `departement_name`, `jahr` and `betrag`.
+
+        `spending_only` keeps the `betrag > 0` rows, as the public-spending summaries do.
+        Several rows for one department-year are summed, as the yearly totals are.
+        """
+        if spending_only:
+            df = df[df["betrag"] > 0]
+        if df.empty:
+            return cls([], [], np.zeros((0, 0)))
+        # Same grouped sum as the per-row merge it replaces, so shares are bit-identical
+        totals = df.groupby("jahr")["betrag"].sum()
+        dept_codes, depts = pd.factorize(df["departement_name"], sort=True)
+        year_codes = totals.index.get_indexer(df["jahr"])
+        keep = dept_codes >= 0
+        # Sum rows per cell; a cell with one row gets exactly its amount (0.0 + x == x)
+        cells = dept_codes[keep] * len(totals) + year_codes[keep]
+        size = len(depts) * len(totals)
+        sums = np.bincount(cells, weights=df["betrag"].to_numpy(dtype=float)[keep], minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        amounts = np.where(counts > 0, sums, np.nan).reshape(len(depts), len(totals))
+        return cls(list(depts), totals.index.to_numpy(), amounts, totals.to_numpy(dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.departments)
+
+    @property
+    def empty(self) -> bool:
+        return not self.departments
+
+    def since(self, start_year: int) -> "ShareMatrix":
+        """The window `jahr >= start_year`; departments without a remaining year are dropped."""
+        cols = self.years >= start_year
+        rows = self.valid[:, cols].any(axis=1)
+        return ShareMatrix(
+            [d for d, keep in zip(self.departments, rows) if keep],
+            self.years[cols],
+            self.amounts[np.ix_(rows, cols)],
+            self.totals[cols],
+        )
+
+    def take(self, rows) -> "ShareMatrix":
+        """A subset of departments (indices or a slice) with the same years and totals."""
+        rows = np.arange(len(self.departments))[rows]
+        return ShareMatrix([self.departments[i] for i in rows], self.years, self.amounts[rows], self.totals)
+
+    def observed(self, i: int):
+        """(years, shares) of department row `i` where it has data, oldest first, as plain lists."""
+        mask = self.valid[i]
+        return self.years[mask].tolist(), self.shares[i, mask].tolist()
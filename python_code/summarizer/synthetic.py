@@ -0,0 +1,117 @@
+"""Seeded synthetic budgets in the aggregate schema, for offline scale testing.
+
+`generate_budget` emits `jahr, betrag, departement_key, departement_name` rows
+like `zrh_budget_by_dept_year.csv`: every department gets a base level, a
+yearly log-growth trend and per-cell noise; a fraction are net-revenue
+departments with negative amounts (like the Finanzdepartement), and cells can
+be dropped to model departments with missing years. `generate_account_rows`
+splits the same cells into sachkonto/institution rows for the drill-down.
+
+Select it as a data source with `ZRH_DATA_SOURCE`, e.g.
+
+    ZRH_DATA_SOURCE="synthetic:departments=10000,years=50,seed=7" python3 server.py
+
+and `load_or_fetch`, the dataset store behind `answer_request` and the
+drill-down loader all use the generated table instead of the CSV or the API.
+The same spec always yields the same data.
+"""
+
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from .config import FIELD_TO_DEPT, YEARS
+else:
+    from config import FIELD_TO_DEPT, YEARS  # type: ignore
+
+SOURCE_PREFIX = "synthetic:"
+
+
+class SyntheticSpec(NamedTuple):
+    departments: int = 10
+    years: int = len(YEARS)
+    end_year: int = YEARS[-1]
+    seed: int = 0
+    trend: float = 0.03  # sd of the per-department yearly log-growth
+    noise: float = 0.05  # sd of the per-cell log noise
+    revenue: float = 0.1  # fraction of net-revenue (negative) departments
+    missing: float = 0.0  # probability that a department-year cell is absent
+    accounts: int = 0  # sachkonto rows per cell for `generate_account_rows`
+
+    def to_source(self) -> str:
+        return SOURCE_PREFIX + ",".join(f"{k}={v}" for k, v in self._asdict().items())
+
+
+def parse_spec(source: str) -> SyntheticSpec:
+    """Parse `synthetic:key=value,...`; unspecified keys keep their defaults."""
+    body = source[len(SOURCE_PREFIX):] if source.startswith(SOURCE_PREFIX) else source
+    values = {}
+    for part in filter(None, (p.strip() for p in body.split(","))):
+        key, sep, raw = part.partition("=")
+        key = key.strip()
+        if not sep or key not in SyntheticSpec._fields:
+            raise ValueError(f"Bad synthetic spec entry {part!r}; known keys: {', '.join(SyntheticSpec._fields)}")
+        default = SyntheticSpec._field_defaults[key]
+        values[key] = type(default)(raw.strip())
+    return SyntheticSpec(**values)
+
+
+def is_synthetic(source: Optional[str]) -> bool:
+    return bool(source) and source.startswith(SOURCE_PREFIX)
+
+
+def department_names(n: int) -> List[str]:
+    # Real names first, so the NLU field vocabulary still resolves against synthetic data
+    real = list(dict.fromkeys(FIELD_TO_DEPT.values()))
+    return real[:n] + [f"Departement {i:05d}" for i in range(len(real), n)]
+
+
+@lru_cache(maxsize=8)
+def generate_budget(spec: SyntheticSpec = SyntheticSpec()) -> pd.DataFrame:
+    """Department-year totals for `spec`; cached, so treat the frame as read-only."""
+    rng = np.random.default_rng(spec.seed)
+    n, n_years = spec.departments, spec.years
+    years = np.arange(spec.end_year - n_years + 1, spec.end_year + 1)
+    base = rng.lognormal(mean=np.log(2e8), sigma=1.0, size=n)
+    growth = rng.normal(0.0, spec.trend, size=n)
+    noise = rng.normal(0.0, spec.noise, size=(n, n_years))
+    t = np.arange(n_years)[None, :]
+    amounts = np.round(base[:, None] * np.exp(growth[:, None] * t + noise))
+    revenue = rng.random(n) < spec.revenue
+    amounts[revenue] *= -10.0  # net-revenue departments dwarf their spending peers, as in the real data
+    present = rng.random((n, n_years)) >= spec.missing
+
+    dept_idx, year_idx = np.nonzero(present)
+    names = np.asarray(department_names(n), dtype=object)
+    return pd.DataFrame({
+        "jahr": years[year_idx].astype(np.int64),
+        "betrag": amounts[dept_idx, year_idx].astype(np.int64),
+        "departement_key": (dept_idx + 10).astype(np.int64),
+        "departement_name": pd.array(names[dept_idx], dtype="str"),
+    })
+
+
+def generate_account_rows(spec: SyntheticSpec = SyntheticSpec()) -> pd.DataFrame:
+    """Split each department-year of `generate_budget(spec)` into `spec.accounts` account rows."""
+    if __package__:
+        from .drilldown import compact_rows
+    else:
+        from drilldown import compact_rows  # type: ignore
+
+    per_cell = max(spec.accounts, 1)
+    totals = generate_budget(spec)
+    rng = np.random.default_rng(spec.seed + 1)
+    weights = rng.gamma(1.0, size=(len(totals), per_cell))
+    weights /= weights.sum(axis=1, keepdims=True)
+    n = len(totals) * per_cell
+    return compact_rows(pd.DataFrame({
+        "jahr": np.repeat(totals["jahr"].to_numpy(), per_cell),
+        "betrag": (totals["betrag"].to_numpy(dtype=float)[:, None] * weights).ravel(),
+        "departement_key": np.repeat(totals["departement_key"].to_numpy(), per_cell),
+        "departement": np.repeat(totals["departement_name"].to_numpy(dtype=object), per_cell),
+        "institution": (rng.integers(0, 20, n) + 1000).astype(str),
+        "sachkonto": (np.tile(np.arange(per_cell), len(totals)) % 90 + 10).astype(str),
+    }))
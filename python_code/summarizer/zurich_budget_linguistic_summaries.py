@@ -1,45 +1,44 @@
 import os
 import sys
 import math
-import time
 import json
+import asyncio
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Mapping
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import Executor
+from typing import List, Dict, Tuple, Optional, NamedTuple
 
-try:
-    import requests
-except Exception:
-    requests = None
 import pandas as pd
 import numpy as np
 
-API_BASE = "https://api.stadt-zuerich.ch/rpkk-rs/v1"
-# Public API key from https://data.stadt-zuerich.ch/dataset/fd_rpktool
-API_KEY = os.environ.get("ZRH_API_KEY", "vopVcmhIMkeUCf8gQjk1GgU2wK+fKihAdlCl0WKJ")
-
-HEADERS_CANDIDATES = [
-    {"api-key": API_KEY},
-]
-
-YEARS = list(range(2019, 2025))
-BETRAGS_TYP = "GEMEINDERAT_BESCHLUSS"
-
-# Mapping common English topics to official Zurich department names
-FIELD_TO_DEPT = {
-    "education": "Schul- und Sportdepartement",
-    "healthcare": "Gesundheits- und Umweltdepartement",
-    "transport": "Tiefbau- und Entsorgungsdepartement",
-    "energy": "Departement der Industriellen Betriebe",
-    "digital infrastructure": "Departement der Industriellen Betriebe",
-    "security": "Sicherheitsdepartement",
-    "housing": "Hochbaudepartement",
-    "presidency": "Präsidialdepartement",
-    "administration": "Behörden und Gesamtverwaltung",
-    "finance": "Finanzdepartement",
-}
+if __package__:
+    from . import colstore, instrument
+    from .calibration_sketch import CalibrationSketch
+    from .colstore import file_digest as _file_digest
+    from .config import API_BASE, BETRAGS_TYP, DATA_SOURCE, FIELD_TO_DEPT, HEADERS_CANDIDATES, YEARS
+    from .fetcher import AsyncFetchEngine, FetchEngine, SingleFlight
+    from .http_cache import ENABLED as HTTP_CACHE_ENABLED, HttpCache
+    from .share_matrix import ShareMatrix
+    from .synthetic import generate_budget, is_synthetic, parse_spec
+else:
+    import colstore  # type: ignore
+    import instrument  # type: ignore
+    from calibration_sketch import CalibrationSketch  # type: ignore
+    from colstore import file_digest as _file_digest  # type: ignore
+    from config import API_BASE, BETRAGS_TYP, DATA_SOURCE, FIELD_TO_DEPT, HEADERS_CANDIDATES, YEARS  # type: ignore
+    from fetcher import AsyncFetchEngine, FetchEngine, SingleFlight  # type: ignore
+    from http_cache import ENABLED as HTTP_CACHE_ENABLED, HttpCache  # type: ignore
+    from share_matrix import ShareMatrix  # type: ignore
+    from synthetic import generate_budget, is_synthetic, parse_spec  # type: ignore
 
 CALIBRATION_PATH = Path(__file__).with_name("label_calibration.json")
+# Department-year sums behind the calibration, so new rows can be folded in without a rescan
+CALIBRATION_SKETCH_PATH = CALIBRATION_PATH.with_name(f"{CALIBRATION_PATH.stem}_sketch.npz")
 DEFAULT_LEVEL_MFS: Dict[str, Tuple[float, float, float, float]] = {
     "low": (0.0, 0.0, 7.5, 12.5),
     "medium": (10.0, 15.0, 22.5, 30.0),
@@ -112,41 +111,36 @@ def calibrate_trend_mfs_from_mad(
     }
 
 
-def compute_share_distribution(df: pd.DataFrame, spending_only: bool = True) -> np.ndarray:
-    if spending_only:
-        df_use = df[df["betrag"] > 0].copy()
-    else:
-        df_use = df.copy()
-    if df_use.empty:
+def trend_samples(years, shares: np.ndarray) -> np.ndarray:
+    """Theil–Sen slope as % of the mean share for every department row observed in at least two years."""
+    shares = np.atleast_2d(np.asarray(shares, dtype=float))
+    shares = shares[np.count_nonzero(~np.isnan(shares), axis=1) >= 2]
+    if shares.shape[0] == 0:
         return np.array([], dtype=float)
-    totals = df_use.groupby("jahr", as_index=False)["betrag"].sum().rename(columns={"betrag": "city_total"})
-    merged = df_use.merge(totals, on="jahr", how="left")
-    merged["share_pct"] = (merged["betrag"] / merged["city_total"]) * 100.0
-    return merged["share_pct"].to_numpy()
+    slopes = theil_sen_slopes(years, shares)
+    # Mean of the observed values only, summed like np.mean over each department's series
+    mean_level = np.array([np.mean(row[~np.isnan(row)]) for row in shares])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mean_level == 0, 0.0, (slopes / mean_level) * 100.0)
+
+
+def compute_share_distribution(df: pd.DataFrame, spending_only: bool = True) -> np.ndarray:
+    matrix = ShareMatrix.from_frame(df, spending_only)
+    return matrix.shares[matrix.valid]
 
 
 def compute_trend_distribution(df: pd.DataFrame, spending_only: bool = True) -> np.ndarray:
-    if spending_only:
-        df_use = df[df["betrag"] > 0].copy()
-    else:
-        df_use = df.copy()
-    if df_use.empty:
-        return np.array([], dtype=float)
-    totals = df_use.groupby("jahr", as_index=False)["betrag"].sum().rename(columns={"betrag": "city_total"})
-    merged = df_use.merge(totals, on="jahr", how="left")
-    merged["share_pct"] = (merged["betrag"] / merged["city_total"]) * 100.0
-    values = []
-    for _, grp in merged.groupby("departement_name"):
-        grp = grp.sort_values("jahr")
-        shares = grp["share_pct"].tolist()
-        years = grp["jahr"].tolist()
-        if len(shares) < 2:
-            continue
-        slope_abs = theil_sen_slope(years, shares)
-        mean_level = np.mean(shares) if shares else 0.0
-        slope_pct = 0.0 if mean_level == 0 else (slope_abs / mean_level) * 100.0
-        values.append(slope_pct)
-    return np.array(values, dtype=float)
+    matrix = ShareMatrix.from_frame(df, spending_only)
+    return trend_samples(matrix.years, matrix.shares)
+
+
+def calibrate_from_sketch(sketch: CalibrationSketch, spending_only: bool = True) -> Tuple[Dict, Dict]:
+    """Level and trend membership functions from a `CalibrationSketch`, without touching the raw rows."""
+    matrix = sketch.share_matrix(spending_only)
+    return (
+        calibrate_level_mfs_from_quantiles(matrix.shares[matrix.valid]),
+        calibrate_trend_mfs_from_mad(trend_samples(matrix.years, matrix.shares)),
+    )
 
 
 def save_calibration(
@@ -154,6 +148,7 @@ def save_calibration(
     trend_mfs: Dict[str, Tuple[float, float, float, float]],
     df: Optional[pd.DataFrame] = None,
     path: Path = CALIBRATION_PATH,
+    source_years: Optional[List[int]] = None,
 ) -> None:
     payload = {
         "source_years": None,
@@ -162,6 +157,8 @@ def save_calibration(
     }
     if df is not None and not df.empty:
         payload["source_years"] = [int(df["jahr"].min()), int(df["jahr"].max())]
+    elif source_years:
+        payload["source_years"] = [int(min(source_years)), int(max(source_years))]
     with path.open("w", encoding="utf-8") as f:
         json.dump(payload, f, indent=2)
 
@@ -194,78 +191,125 @@ def load_calibration(path: Path = CALIBRATION_PATH) -> Optional[Tuple[Dict, Dict
     return level, trend
 
 
+def clear_calibration_cache() -> None:
+    """Forget the loaded membership functions; the next `ensure_calibration` re-reads the file."""
+    global LEVEL_MFS_CACHE, TREND_MFS_CACHE
+    LEVEL_MFS_CACHE = TREND_MFS_CACHE = None
+
+
 def ensure_calibration(reference_df: Optional[pd.DataFrame] = None) -> Tuple[Dict, Dict]:
     global LEVEL_MFS_CACHE, TREND_MFS_CACHE
     if LEVEL_MFS_CACHE and TREND_MFS_CACHE:
         return LEVEL_MFS_CACHE, TREND_MFS_CACHE
-    loaded = load_calibration()
-    if loaded:
-        LEVEL_MFS_CACHE, TREND_MFS_CACHE = loaded
-        return loaded
-    if reference_df is None or reference_df.empty:
-        LEVEL_MFS_CACHE, TREND_MFS_CACHE = DEFAULT_LEVEL_MFS, DEFAULT_TREND_MFS
-        return LEVEL_MFS_CACHE, TREND_MFS_CACHE
-    share_samples = compute_share_distribution(reference_df, spending_only=True)
-    slope_samples = compute_trend_distribution(reference_df, spending_only=True)
-    level_mfs = calibrate_level_mfs_from_quantiles(share_samples)
-    trend_mfs = calibrate_trend_mfs_from_mad(slope_samples)
-    save_calibration(level_mfs, trend_mfs, reference_df)
-    LEVEL_MFS_CACHE, TREND_MFS_CACHE = level_mfs, trend_mfs
-    return level_mfs, trend_mfs
-
-def http_get(url: str, params: Dict = None):
-    if requests is None:
-        raise RuntimeError("The 'requests' package is not installed; cannot fetch from API. Use local CSV or install requests.")
-    last_exc = None
-    for headers in HEADERS_CANDIDATES:
-        try:
-            resp = requests.get(url, headers=headers, params=params, timeout=20)
-            if resp.status_code == 200:
-                return resp
-            # If unauthorized, try the next header style
-            if resp.status_code in (401, 403):
-                last_exc = RuntimeError(f"Unauthorized with headers {headers.keys()}")
-                continue
-            # Propagate other HTTP errors
-            resp.raise_for_status()
-        except Exception as e:
-            last_exc = e
-    if last_exc:
-        raise last_exc
-    raise RuntimeError("HTTP request failed with no further detail.")
-
-def get_departments() -> pd.DataFrame:
+    LEVEL_MFS_CACHE, TREND_MFS_CACHE = load_or_calibrate(reference_df, CALIBRATION_PATH)
+    return LEVEL_MFS_CACHE, TREND_MFS_CACHE
+
+
+def load_or_calibrate(reference_df: Optional[pd.DataFrame], path: Optional[Path]) -> Tuple[Dict, Dict]:
+    """Membership functions from the calibration file at `path`, else calibrated on `reference_df`.
+
+    A fresh calibration is saved to `path` (with its sketch alongside, see
+    `calibration_sketch_path`); `path=None` keeps it in memory only. Without
+    reference rows the defaults are used.
+    """
+    with instrument.stage("calibration"):
+        loaded = load_calibration(path) if path is not None else None
+        if loaded:
+            return loaded
+        if reference_df is None or reference_df.empty:
+            return DEFAULT_LEVEL_MFS, DEFAULT_TREND_MFS
+        sketch = CalibrationSketch.from_frame(reference_df)
+        level_mfs, trend_mfs = calibrate_from_sketch(sketch)
+        if path is not None:
+            save_calibration(level_mfs, trend_mfs, reference_df, path=path)
+            sketch.save(calibration_sketch_path(path))
+        return level_mfs, trend_mfs
+
+
+def calibration_sketch_path(path: Path) -> Path:
+    """Where the sketch behind the calibration file `path` is kept (`label_calibration_sketch.npz` by default)."""
+    return path.with_name(f"{path.stem}_sketch.npz")
+
+# Shared keep-alive session, global rate limit, retry policy and response cache for every API call
+FETCH_ENGINE = FetchEngine(HEADERS_CANDIDATES, cache=HttpCache() if HTTP_CACHE_ENABLED else None)
+# The same engine for asyncio callers (see `answer_request_async`)
+ASYNC_FETCH_ENGINE = AsyncFetchEngine(FETCH_ENGINE)
+
+
+def http_get(url: str, params: Dict = None, engine: Optional[FetchEngine] = None):
+    return (engine or FETCH_ENGINE).get(url, params=params)
+
+def get_departments(engine: Optional[FetchEngine] = None) -> pd.DataFrame:
     url = f"{API_BASE}/departemente"
-    resp = http_get(url)
+    resp = http_get(url, engine=engine)
     data = resp.json().get("value", [])
     return pd.DataFrame(data)
 
-def get_sachkonto2_for_department(dept_key: int, years: List[int], betrags_typ: str) -> pd.DataFrame:
+def _fetch_sachkonto2_cell(
+    dept_key: int, year: int, betrags_typ: str, engine: Optional[FetchEngine] = None
+) -> Optional[pd.DataFrame]:
     # Endpoint fields: betrag (string CHF), betragsTyp, institution, jahr, sachkonto
     url = f"{API_BASE}/sachkonto2stellig"
-    frames = []
-    for y in years:
-        params = {"departement": dept_key, "jahr": y, "betragsTyp": betrags_typ}
-        resp = http_get(url, params=params)
-        value = resp.json().get("value", [])
-        if not value:
-            continue
-        df = pd.DataFrame(value)
-        df["jahr"] = df["jahr"].astype(int)
-        df["betrag"] = pd.to_numeric(df["betrag"], errors="coerce").fillna(0.0)
-        frames.append(df)
-        time.sleep(0.2)  # we are polite, right?
+    params = {"departement": dept_key, "jahr": year, "betragsTyp": betrags_typ}
+    return _sachkonto2_frame(http_get(url, params=params, engine=engine))
+
+def _sachkonto2_frame(resp) -> Optional[pd.DataFrame]:
+    value = resp.json().get("value", [])
+    if not value:
+        return None
+    df = pd.DataFrame(value)
+    df["jahr"] = df["jahr"].astype(int)
+    df["betrag"] = pd.to_numeric(df["betrag"], errors="coerce").fillna(0.0)
+    return df
+
+def _concat_sachkonto2(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    frames = [f for f in frames if f is not None]
     if frames:
         return pd.concat(frames, ignore_index=True)
     return pd.DataFrame(columns=["betrag", "betragsTyp", "institution", "jahr", "sachkonto"])
 
-def aggregate_department_totals(years: List[int]) -> pd.DataFrame:
-    depts = get_departments()
+def get_sachkonto2_for_department(
+    dept_key: int, years: List[int], betrags_typ: str, engine: Optional[FetchEngine] = None
+) -> pd.DataFrame:
+    engine = engine or FETCH_ENGINE
+    frames = engine.map(lambda y: _fetch_sachkonto2_cell(dept_key, y, betrags_typ, engine), years)
+    return _concat_sachkonto2(frames)
+
+def aggregate_department_totals(
+    years: List[int], engine: Optional[FetchEngine] = None, betrags_typ: str = BETRAGS_TYP
+) -> pd.DataFrame:
+    engine = engine or FETCH_ENGINE
+    depts = get_departments(engine)
+    dept_rows = [(int(row["key"]), row["bezeichnung"]) for _, row in depts.iterrows()]
+    # Fan out every (department, year) cell at once; the engine's token bucket keeps us polite
+    cells = [(dept_key, y) for dept_key, _ in dept_rows for y in years]
+    fetched = engine.map(lambda cell: _fetch_sachkonto2_cell(cell[0], cell[1], betrags_typ, engine), cells)
+    return _department_totals(dept_rows, years, fetched)
+
+async def aggregate_department_totals_async(
+    years: List[int], engine: Optional[AsyncFetchEngine] = None, betrags_typ: str = BETRAGS_TYP
+) -> pd.DataFrame:
+    """`aggregate_department_totals` for asyncio callers; waits on the network without blocking the loop."""
+    engine = engine or ASYNC_FETCH_ENGINE
+    resp = await engine.get(f"{API_BASE}/departemente")
+    depts = pd.DataFrame(resp.json().get("value", []))
+    dept_rows = [(int(row["key"]), row["bezeichnung"]) for _, row in depts.iterrows()]
+    url = f"{API_BASE}/sachkonto2stellig"
+
+    async def fetch_cell(cell: Tuple[int, int]) -> Optional[pd.DataFrame]:
+        params = {"departement": cell[0], "jahr": cell[1], "betragsTyp": betrags_typ}
+        return _sachkonto2_frame(await engine.get(url, params=params))
+
+    cells = [(dept_key, y) for dept_key, _ in dept_rows for y in years]
+    return _department_totals(dept_rows, years, await engine.map(fetch_cell, cells))
+
+def _department_totals(
+    dept_rows: List[Tuple[int, str]], years: List[int], fetched: List[Optional[pd.DataFrame]]
+) -> pd.DataFrame:
+    # `fetched` holds one cell per (department, year), departments outer
     all_rows = []
-    for _, row in depts.iterrows():
-        dept_key = int(row["key"])
-        dept_name = row["bezeichnung"]
-        df = get_sachkonto2_for_department(dept_key, years, BETRAGS_TYP)
+    for i, (dept_key, dept_name) in enumerate(dept_rows):
+        df = _concat_sachkonto2(fetched[i * len(years):(i + 1) * len(years)])
         if df.empty:
             continue
         # Sum across institutions and sachkonto per year
@@ -293,6 +337,39 @@ def theil_sen_slope(years: List[int], values: List[float]) -> float:
         return 0.0
     return float(np.median(slopes))
 
+def theil_sen_slopes(years, share_matrix: np.ndarray, max_pairs_per_chunk: int = 4_000_000) -> np.ndarray:
+    """Batched `theil_sen_slope` over the rows of a departments × years matrix.
+
+    Missing years are NaN and drop out of that row's pairs, so each result is
+    bit-identical to calling `theil_sen_slope` on the row's observed points.
+    Rows with fewer than two observations get 0.0.
+    """
+    x = np.asarray(years, dtype=float)
+    y = np.atleast_2d(np.asarray(share_matrix, dtype=float))
+    out = np.zeros(y.shape[0], dtype=float)
+    if y.shape[1] < 2 or y.shape[0] == 0:
+        return out
+    i, j = np.triu_indices(y.shape[1], k=1)
+    dx = x[j] - x[i]
+    keep = dx != 0
+    i, j, dx = i[keep], j[keep], dx[keep]
+    if dx.size == 0:
+        return out
+    # Bound the pairwise block so multi-decade or account-level inputs stay in memory
+    chunk = max(1, max_pairs_per_chunk // dx.size)
+    for start in range(0, y.shape[0], chunk):
+        block = y[start:start + chunk]
+        pairs = (block[:, j] - block[:, i]) / dx
+        pairs.sort(axis=1)  # NaN (missing) pairs sort to the end
+        n_valid = np.count_nonzero(~np.isnan(pairs), axis=1)
+        rows = np.nonzero(n_valid)[0]
+        k = n_valid[rows] // 2
+        hi = pairs[rows, k]
+        lo = pairs[rows, np.maximum(k - 1, 0)]
+        # Same arithmetic as np.median: middle element, or the mean of the two middle ones
+        out[start + rows] = np.where(n_valid[rows] % 2 == 0, (lo + hi) / 2, hi)
+    return out
+
 def fuzzy_trapezoid(x: float, a: float, b: float, c: float, d: float) -> float:
     # Standard trapezoid membership curve
     if x <= a or x >= d:
@@ -327,42 +404,82 @@ def label_trend(
     label = max(labels, key=labels.get)
     return label, labels[label]
 
-def summarize(
-    out_df: pd.DataFrame,
-    spending_only: bool = True,
-    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
-    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
-) -> pd.DataFrame:
-    # Compute city totals, department shares, slopes, and summary sentences
-    if spending_only:
-        df = out_df[out_df["betrag"] > 0].copy()
-    else:
-        df = out_df.copy()
+LEVEL_LABELS = ("low", "medium", "high")
+TREND_LABELS = ("falling", "stable", "rising")
 
-    if df.empty:
-        return pd.DataFrame(columns=[
-            "departement", "last_year", "share_last_pct", "slope_pp_per_year",
-            "slope_pct_of_mean", "level_label", "level_mu", "trend_label", "trend_mu", "sentence"
-        ])
+def fuzzy_trapezoid_array(x, a: float, b: float, c: float, d: float) -> np.ndarray:
+    """Array version of `fuzzy_trapezoid` with the same branch precedence and arithmetic."""
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rise = (x - a) / (b - a)
+        fall = (d - x) / (d - c)
+    # Apply branches from lowest to highest precedence so earlier checks win, as in the scalar code
+    out = np.where((c < x) & (x < d), fall, 0.0)
+    out = np.where((a < x) & (x < b), rise, out)
+    out = np.where((b <= x) & (x <= c), 1.0, out)
+    return np.where((x <= a) | (x >= d), 0.0, out)
 
-    totals = df.groupby("jahr", as_index=False)["betrag"].sum().rename(columns={"betrag": "city_total"})
-    merged = df.merge(totals, on="jahr", how="left")
-    merged["share_pct"] = (merged["betrag"] / merged["city_total"]) * 100.0
+def fuzzy_labels(
+    values, mfs: Dict[str, Tuple[float, float, float, float]], labels: Tuple[str, ...]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Evaluate every trapezoid over a whole column and return (label codes into `labels`, μ).
 
-    summaries = []
-    for dept, grp in merged.groupby("departement_name"):
-        grp = grp.sort_values("jahr")
-        shares = grp["share_pct"].tolist()
-        years = grp["jahr"].tolist()
-        last_share = shares[-1]
+    Ties go to the earliest label, matching `max(labels, key=labels.get)` in the scalar path.
+    """
+    x = np.asarray(values, dtype=float)
+    mu = np.stack([fuzzy_trapezoid_array(x, *mfs[name]) for name in labels], axis=-1)
+    codes = mu.argmax(axis=-1)
+    return codes, np.take_along_axis(mu, codes[..., None], axis=-1)[..., 0]
+
+def label_levels(
+    share_pcts, mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized `label_level`; map codes back with `LEVEL_LABELS`."""
+    return fuzzy_labels(share_pcts, mfs or LEVEL_MFS_CACHE or DEFAULT_LEVEL_MFS, LEVEL_LABELS)
+
+def label_trends(
+    slopes_pct_per_year, mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized `label_trend`; map codes back with `TREND_LABELS`."""
+    return fuzzy_labels(slopes_pct_per_year, mfs or TREND_MFS_CACHE or DEFAULT_TREND_MFS, TREND_LABELS)
+
+SUMMARY_COLUMNS = [
+    "departement", "last_year", "share_last_pct", "slope_pp_per_year",
+    "slope_pct_of_mean", "level_label", "level_mu", "trend_label", "trend_mu", "sentence"
+]
+
+# Worker processes for summarize/build_window_cube; 1 (the default) stays in-process
+SUMMARIZE_PROCESSES = int(os.environ.get("ZRH_SUMMARIZE_PROCESSES", "1"))
+# Below this many departments a pool costs more than it saves
+PARALLEL_MIN_GROUPS = 256
+
+
+def _summary_records(
+    matrix: ShareMatrix,
+    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]],
+    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]],
+) -> List[Dict]:
+    # One summary row per department of `matrix`, in name order
+    slopes = theil_sen_slopes(matrix.years, matrix.shares).tolist()
+    series = []
+    for i, dept in enumerate(matrix.departments):
+        years, shares = matrix.observed(i)
         mean_level = np.mean(shares) if shares else 0.0
 
         # Use slope relative to mean for scale invariance
-        slope_abs = theil_sen_slope(years, shares)  # percentage points per year
+        slope_abs = slopes[i]  # percentage points per year
         slope_pct_of_mean = 0.0 if mean_level == 0 else (slope_abs / mean_level) * 100.0
+        series.append((dept, years, shares, slope_abs, slope_pct_of_mean))
 
-        level_label, level_mu = label_level(last_share, level_mfs)
-        trend_label, trend_mu = label_trend(slope_pct_of_mean, trend_mfs)
+    # Label every department in one vectorized pass
+    level_codes, level_mus = label_levels([s[2][-1] for s in series], level_mfs)
+    trend_codes, trend_mus = label_trends([s[4] for s in series], trend_mfs)
+
+    summaries = []
+    for i, (dept, years, shares, slope_abs, slope_pct_of_mean) in enumerate(series):
+        last_share = shares[-1]
+        level_label, level_mu = LEVEL_LABELS[level_codes[i]], float(level_mus[i])
+        trend_label, trend_mu = TREND_LABELS[trend_codes[i]], float(trend_mus[i])
 
         sentence = (f"{dept}: share is {level_label.upper()} and {trend_label.upper()} "
                     f"({slope_abs:+.2f} pp/yr; {years[0]}→{years[-1]}: {shares[0]:.2f}%→{shares[-1]:.2f}%).")
@@ -378,21 +495,1033 @@ def summarize(
             "trend_mu": trend_mu,
             "sentence": sentence
         })
-    return pd.DataFrame(summaries).sort_values(["last_year", "share_last_pct"], ascending=[False, False])
+    return summaries
 
 
-def load_or_fetch(years: List[int]) -> pd.DataFrame:
-    """Load precomputed CSV if available, otherwise fetch from API.
-    Keeps behavior deterministic when network is unavailable.
+def _summary_records_parallel(matrix: ShareMatrix, level_mfs: Dict, trend_mfs: Dict, processes: int) -> List[Dict]:
+    import multiprocessing
+
+    # Contiguous runs of departments in name order, so concatenated results keep the serial order
+    n_groups = len(matrix)
+    cuts = np.linspace(0, n_groups, min(n_groups, processes * 4) + 1).astype(int)
+    chunks = [(matrix.take(slice(a, b)), level_mfs, trend_mfs) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.starmap(_summary_records, chunks)
+    return [row for part in parts for row in part]
+
+
+def summarize(
+    out_df: pd.DataFrame,
+    spending_only: bool = True,
+    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    processes: Optional[int] = None,
+) -> pd.DataFrame:
+    """Compute city totals, department shares, slopes, and summary sentences.
+
+    With `processes` > 1 (default `ZRH_SUMMARIZE_PROCESSES`) and at least
+    `PARALLEL_MIN_GROUPS` departments, departments are split across a process
+    pool; every row is computed independently, so the result is identical.
     """
+    return summarize_shares(ShareMatrix.from_frame(out_df, spending_only), level_mfs, trend_mfs, processes)
+
+
+def summarize_shares(
+    matrix: ShareMatrix,
+    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    processes: Optional[int] = None,
+) -> pd.DataFrame:
+    """`summarize` for an already built `ShareMatrix` (e.g. one window of the full table's matrix)."""
+    if matrix.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    processes = SUMMARIZE_PROCESSES if processes is None else processes
+    if processes > 1 and len(matrix) >= PARALLEL_MIN_GROUPS:
+        # Resolve the calibration here: workers may not share this process's cache
+        level_mfs = level_mfs or LEVEL_MFS_CACHE or DEFAULT_LEVEL_MFS
+        trend_mfs = trend_mfs or TREND_MFS_CACHE or DEFAULT_TREND_MFS
+        summaries = _summary_records_parallel(matrix, level_mfs, trend_mfs, processes)
+    else:
+        summaries = _summary_records(matrix, level_mfs, trend_mfs)
+    return pd.DataFrame(summaries).sort_values(["last_year", "share_last_pct"], ascending=[False, False])
+
+
+AGGREGATE_CSV_NAME = "zrh_budget_by_dept_year.csv"
+
+
+def find_aggregate_csv() -> Optional[Path]:
+    """Return the first cached aggregate CSV (working dir first, then package root)."""
     csv_candidates = [
-        Path("zrh_budget_by_dept_year.csv"),
-        Path(__file__).resolve().parents[1] / "zrh_budget_by_dept_year.csv",
+        Path(AGGREGATE_CSV_NAME),
+        Path(__file__).resolve().parents[1] / AGGREGATE_CSV_NAME,
     ]
     for csv_path in csv_candidates:
         if csv_path.exists():
-            return pd.read_csv(csv_path)
-    return aggregate_department_totals(years)
+            return csv_path.resolve()
+    return None
+
+
+def source_csv(source: str) -> Optional[Path]:
+    """The aggregate CSV behind a non-synthetic data source, or None to fetch from the API.
+
+    "" is the cached default table (API when absent), "api" always fetches, and
+    anything else is the path of a CSV in the aggregate's schema.
+    """
+    if source == "api":
+        return None
+    if not source:
+        return find_aggregate_csv()
+    path = Path(source).expanduser()
+    if not path.exists():
+        raise FileNotFoundError(f"Aggregate CSV not found: {path}")
+    return path.resolve()
+
+
+def load_or_fetch(years: List[int], source: Optional[str] = None) -> pd.DataFrame:
+    """Load precomputed CSV if available, otherwise fetch from API.
+    Keeps behavior deterministic when network is unavailable. The CSV is read
+    through its column store (see `colstore`) whenever that is up to date; the
+    columns are mapped copy-on-write, so callers may edit the frame, and a stale
+    store is left for the sync and serving paths to rebuild.
+    A "synthetic:..." `source` (default `ZRH_DATA_SOURCE`) generates the table instead;
+    see `source_csv` for the other forms.
+    """
+    source = DATA_SOURCE if source is None else source
+    with instrument.stage("load"):
+        if is_synthetic(source):
+            df = generate_budget(parse_spec(source)).copy()
+        else:
+            csv_path = source_csv(source)
+            df = (
+                colstore.read_table(csv_path, writable=True, build=False)[0]
+                if csv_path is not None
+                else aggregate_department_totals(years)
+            )
+    instrument.count("rows_loaded", len(df))
+    return df
+
+
+def sync_state_path(csv_path: Path) -> Path:
+    """Sidecar holding per-cell fetch timestamps next to the aggregate CSV."""
+    return csv_path.with_suffix(".sync.json")
+
+
+def _cell_key(dept_key: int, year: int) -> str:
+    return f"{int(dept_key)}:{int(year)}"
+
+
+def parse_cell_spec(spec: str) -> Tuple[Optional[int], Optional[int]]:
+    """Parse an invalidation spec: "2024" (year), "10:" (department) or "10:2024" (one cell)."""
+    if ":" not in spec:
+        return None, int(spec)
+    dept, _, year = spec.partition(":")
+    return (int(dept) if dept else None), (int(year) if year else None)
+
+
+def _load_sync_state(path: Path) -> Dict:
+    if not path.exists():
+        return {"betrags_typ": BETRAGS_TYP, "cells": {}}
+    with path.open("r", encoding="utf-8") as f:
+        state = json.load(f)
+    state.setdefault("cells", {})
+    return state
+
+
+def _write_atomic(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def sync_department_totals(
+    years: List[int],
+    departments: Optional[List[int]] = None,
+    invalidate: Optional[List[Tuple[Optional[int], Optional[int]]]] = None,
+    max_age_days: Optional[float] = None,
+    csv_path: Optional[Path] = None,
+    engine: Optional[FetchEngine] = None,
+) -> pd.DataFrame:
+    """Incrementally refresh the aggregate: fetch only missing, stale or invalidated cells.
+
+    A cell is one `(departement_key, jahr)` pair. Fetch times are recorded in a
+    sidecar (see `sync_state_path`) so later syncs can skip fresh cells; cells that
+    came with a CSV but without a timestamp count as fresh unless `max_age_days` is set.
+    `invalidate` entries are `(dept_key, year)` pairs where None acts as a wildcard.
+    """
+    engine = engine or FETCH_ENGINE
+    csv_path = Path(csv_path) if csv_path is not None else (find_aggregate_csv() or Path(AGGREGATE_CSV_NAME))
+    state_path = sync_state_path(csv_path)
+    state = _load_sync_state(state_path)
+    if state.get("betrags_typ") != BETRAGS_TYP:
+        # Different amount type: nothing on disk is comparable
+        state = {"betrags_typ": BETRAGS_TYP, "cells": {}}
+        existing = pd.DataFrame(columns=["jahr", "betrag", "departement_key", "departement_name"])
+    elif csv_path.exists():
+        existing = colstore.read_table(csv_path)[0]
+    else:
+        existing = pd.DataFrame(columns=["jahr", "betrag", "departement_key", "departement_name"])
+
+    dept_names = dict(zip(existing["departement_key"].astype(int), existing["departement_name"]))
+    if departments is None or any(int(k) not in dept_names for k in departments):
+        api_depts = get_departments(engine)
+        dept_names.update((int(r["key"]), r["bezeichnung"]) for _, r in api_depts.iterrows())
+        if departments is None:
+            departments = [int(k) for k in api_depts["key"]]
+
+    now = datetime.now(timezone.utc)
+    present = set(zip(existing["departement_key"].astype(int), existing["jahr"].astype(int)))
+    invalidate = invalidate or []
+
+    def _is_fresh(dept_key: int, year: int) -> bool:
+        for inv_dept, inv_year in invalidate:
+            if (inv_dept is None or inv_dept == dept_key) and (inv_year is None or inv_year == year):
+                return False
+        entry = state["cells"].get(_cell_key(dept_key, year))
+        if entry is None:
+            return max_age_days is None and (dept_key, year) in present
+        if max_age_days is None:
+            return True
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        return (now - fetched_at).total_seconds() <= max_age_days * 86400
+
+    todo = [(int(d), int(y)) for d in departments for y in years if not _is_fresh(int(d), int(y))]
+    if not todo:
+        return existing
+
+    fetched = engine.map(lambda cell: _fetch_sachkonto2_cell(cell[0], cell[1], BETRAGS_TYP, engine), todo)
+    new_rows = []
+    stamp = now.isoformat(timespec="seconds")
+    for (dept_key, year), df in zip(todo, fetched):
+        state["cells"][_cell_key(dept_key, year)] = {"fetched_at": stamp, "rows": 0 if df is None else len(df)}
+        if df is None or df.empty:
+            continue
+        new_rows.append({
+            "jahr": year,
+            # Sum across institutions and sachkonto, as in aggregate_department_totals
+            "betrag": df["betrag"].sum(),
+            "departement_key": dept_key,
+            "departement_name": dept_names.get(dept_key, str(dept_key)),
+        })
+
+    # Refetched cells replace their old rows, even when the API now returns nothing
+    todo_set = set(todo)
+    keep = [(int(k), int(y)) not in todo_set for k, y in zip(existing["departement_key"], existing["jahr"])]
+    merged = pd.concat([existing[keep], pd.DataFrame(new_rows, columns=existing.columns)], ignore_index=True)
+    merged = merged.sort_values(["departement_key", "jahr"], kind="mergesort").reset_index(drop=True)
+    if merged.empty:
+        raise RuntimeError("No data retrieved. Check API key/header or years.")
+
+    _write_atomic(csv_path, lambda p: merged.to_csv(p, index=False))
+    colstore.write_table(merged, csv_path)
+    state["betrags_typ"] = BETRAGS_TYP
+    _write_atomic(state_path, lambda p: p.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8"))
+    return merged
+
+
+def compute_window_slopes(df: pd.DataFrame) -> pd.DataFrame:
+    """Theil–Sen slope and last share per department, with shares recomputed inside the window."""
+    return window_slopes(ShareMatrix.from_frame(df, spending_only=True))
+
+
+def window_slopes(matrix: ShareMatrix) -> pd.DataFrame:
+    """`compute_window_slopes` for an already built `ShareMatrix`."""
+    slopes = theil_sen_slopes(matrix.years, matrix.shares).tolist()
+    rows = []
+    for i, dept in enumerate(matrix.departments):
+        _, shares = matrix.observed(i)
+        if len(shares) < 2:
+            continue
+        rows.append({"departement": dept, "slope_pp_per_year": slopes[i], "last_share": shares[-1]})
+    return pd.DataFrame(rows)
+
+
+class WindowResult(NamedTuple):
+    """Everything `answer_request` needs for one timeline window, precomputed."""
+
+    start_year: int
+    end_year: int
+    summaries: pd.DataFrame
+    slopes: pd.DataFrame
+    # Plain-Python views so cache hits can be answered without pandas
+    summary_by_dept: Mapping[str, Dict]
+    dept_names: List[str]
+    top_increases: List[Dict]
+    top_decreases: List[Dict]
+    # Row positions into `slopes`, steepest increase / decrease first
+    inc_order: List[int]
+    dec_order: List[int]
+
+
+def _mfs_key(level_mfs: Dict, trend_mfs: Dict) -> Tuple:
+    return tuple(sorted(level_mfs.items())), tuple(sorted(trend_mfs.items()))
+
+
+SLOPE_COLUMNS = ["departement", "slope_pp_per_year", "last_share"]
+WINDOW_CUBE_NAME = "zrh_budget_window_cube.json"
+# Memory-mappable copy of the cube that worker processes attach to instead of loading the JSON
+WINDOW_ARRAYS_NAME = "zrh_budget_window_cube.cols"
+
+
+def window_cube_paths(csv_path: Path) -> Tuple[Path, Path]:
+    """(JSON cube, memory-mapped cube) kept next to an aggregate CSV; other tables get their own names."""
+    if csv_path.name == AGGREGATE_CSV_NAME:
+        return csv_path.with_name(WINDOW_CUBE_NAME), csv_path.with_name(WINDOW_ARRAYS_NAME)
+    return csv_path.with_name(f"{csv_path.stem}.window_cube.json"), csv_path.with_name(f"{csv_path.stem}.window_cube.cols")
+
+
+def _assemble_window(
+    start_year: int,
+    end_year: int,
+    summary_records: List[Dict],
+    slope_records: List[Dict],
+    inc_order: List[int],
+    dec_order: List[int],
+) -> WindowResult:
+    """Build a WindowResult from plain records; shared by the live and the precomputed path."""
+    by_dept: Dict[str, Dict] = {}
+    for rec in sorted(summary_records, key=lambda r: r["last_year"], reverse=True):
+        by_dept.setdefault(rec["departement"], rec)
+    return WindowResult(
+        start_year=start_year,
+        end_year=end_year,
+        summaries=pd.DataFrame(summary_records, columns=SUMMARY_COLUMNS),
+        slopes=pd.DataFrame(slope_records, columns=SLOPE_COLUMNS),
+        summary_by_dept=by_dept,
+        dept_names=list(dict.fromkeys(r["departement"] for r in summary_records)),
+        top_increases=[slope_records[i] for i in inc_order[:2]],
+        top_decreases=[slope_records[i] for i in dec_order[:2]],
+        inc_order=inc_order,
+        dec_order=dec_order,
+    )
+
+
+def build_window(
+    df_window: pd.DataFrame,
+    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    matrix: Optional[ShareMatrix] = None,
+) -> WindowResult:
+    """Summarize one timeline slice and derive the lookups used by `answer_request`.
+
+    `matrix` is the slice's spending `ShareMatrix` when the caller already has it
+    (`ShareMatrix.since` of the full table); otherwise it is built from `df_window`.
+    """
+    # Summaries use spending only to mirror public-spending narratives
+    instrument.count("rows_summarized", len(df_window))
+    if matrix is None:
+        matrix = ShareMatrix.from_frame(df_window, spending_only=True)
+    with instrument.stage("summarize"):
+        summaries = summarize_shares(matrix, level_mfs, trend_mfs)
+    with instrument.stage("window_slopes"):
+        slopes_df = window_slopes(matrix) if not summaries.empty else pd.DataFrame(columns=SLOPE_COLUMNS)
+    inc_order: List[int] = []
+    dec_order: List[int] = []
+    if not slopes_df.empty:
+        positions = pd.Series(range(len(slopes_df)), index=slopes_df.index)
+        inc_order = positions[slopes_df.sort_values("slope_pp_per_year", ascending=False).index].tolist()
+        dec_order = positions[slopes_df.sort_values("slope_pp_per_year", ascending=True).index].tolist()
+    return _assemble_window(
+        int(df_window["jahr"].min()),
+        int(df_window["jahr"].max()),
+        summaries.to_dict(orient="records"),
+        slopes_df.to_dict(orient="records"),
+        inc_order,
+        dec_order,
+    )
+
+
+def build_window_cube(
+    df_all: pd.DataFrame,
+    level_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    trend_mfs: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    processes: Optional[int] = None,
+    matrix: Optional[ShareMatrix] = None,
+) -> Dict[int, WindowResult]:
+    """Precompute every `since` window: one WindowResult per distinct start year in the data.
+
+    The spending `ShareMatrix` of `df_all` (pass `matrix` if it is already built) is
+    computed once and sliced per window. Large tables spread the windows over
+    `processes` workers (see `summarize`).
+    """
+    starts = sorted(int(y) for y in df_all["jahr"].unique())
+    if matrix is None:
+        matrix = ShareMatrix.from_frame(df_all, spending_only=True)
+    processes = SUMMARIZE_PROCESSES if processes is None else processes
+    if processes > 1 and len(starts) > 1 and len(matrix) >= PARALLEL_MIN_GROUPS:
+        import multiprocessing
+
+        level_mfs = level_mfs or LEVEL_MFS_CACHE or DEFAULT_LEVEL_MFS
+        trend_mfs = trend_mfs or TREND_MFS_CACHE or DEFAULT_TREND_MFS
+        jobs = [(df_all[df_all["jahr"] >= start], level_mfs, trend_mfs, matrix.since(start)) for start in starts]
+        with multiprocessing.Pool(min(processes, len(jobs))) as pool:
+            return dict(zip(starts, pool.starmap(build_window, jobs)))
+    cube: Dict[int, WindowResult] = {}
+    for start in starts:
+        cube[start] = build_window(df_all[df_all["jahr"] >= start], level_mfs, trend_mfs, matrix.since(start))
+    return cube
+
+
+def save_window_cube(
+    cube: Dict[int, WindowResult],
+    path: Path,
+    data_digest: Optional[str],
+    level_mfs: Dict[str, Tuple[float, float, float, float]],
+    trend_mfs: Dict[str, Tuple[float, float, float, float]],
+) -> None:
+    """Persist the cube as two column-oriented tables indexed by `window_start`.
+
+    The data digest and calibration are stored alongside so stale cubes are ignored on load.
+    """
+    summaries: Dict[str, List] = {c: [] for c in ["window_start"] + SUMMARY_COLUMNS}
+    slopes: Dict[str, List] = {c: [] for c in ["window_start"] + SLOPE_COLUMNS + ["inc_rank", "dec_rank"]}
+    windows = []
+    for start, win in sorted(cube.items()):
+        windows.append({"start_year": win.start_year, "end_year": win.end_year})
+        for rec in win.summaries.to_dict(orient="records"):
+            summaries["window_start"].append(start)
+            for c in SUMMARY_COLUMNS:
+                summaries[c].append(rec[c])
+        inc_rank = {pos: rank for rank, pos in enumerate(win.inc_order)}
+        dec_rank = {pos: rank for rank, pos in enumerate(win.dec_order)}
+        for pos, rec in enumerate(win.slopes.to_dict(orient="records")):
+            slopes["window_start"].append(start)
+            for c in SLOPE_COLUMNS:
+                slopes[c].append(rec[c])
+            slopes["inc_rank"].append(inc_rank[pos])
+            slopes["dec_rank"].append(dec_rank[pos])
+    payload = {
+        "data_digest": data_digest,
+        "level_mfs": {k: list(v) for k, v in level_mfs.items()},
+        "trend_mfs": {k: list(v) for k, v in trend_mfs.items()},
+        "windows": windows,
+        "summaries": summaries,
+        "slopes": slopes,
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, default=_json_scalar)
+    os.replace(tmp, path)
+
+
+def _json_scalar(value):
+    # NumPy scalars sneak in through DataFrame records
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def load_window_cube(
+    path: Path,
+    data_digest: Optional[str],
+    level_mfs: Dict[str, Tuple[float, float, float, float]],
+    trend_mfs: Dict[str, Tuple[float, float, float, float]],
+) -> Optional[Dict[int, WindowResult]]:
+    """Load a persisted cube, or None if it is missing or built from other data/calibration."""
+    if data_digest is None or not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if not _built_from(payload, data_digest, level_mfs, trend_mfs):
+            return None
+        summaries, slopes = payload["summaries"], payload["slopes"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    def _rows(table: Dict[str, List], start: int) -> List[int]:
+        return [i for i, w in enumerate(table["window_start"]) if w == start]
+
+    cube: Dict[int, WindowResult] = {}
+    for win in payload["windows"]:
+        start = int(win["start_year"])
+        s_rows = _rows(summaries, start)
+        p_rows = _rows(slopes, start)
+        summary_records = [{c: summaries[c][i] for c in SUMMARY_COLUMNS} for i in s_rows]
+        slope_records = [{c: slopes[c][i] for c in SLOPE_COLUMNS} for i in p_rows]
+        inc_order = sorted(range(len(p_rows)), key=lambda k: slopes["inc_rank"][p_rows[k]])
+        dec_order = sorted(range(len(p_rows)), key=lambda k: slopes["dec_rank"][p_rows[k]])
+        cube[start] = _assemble_window(
+            start, int(win["end_year"]), summary_records, slope_records, inc_order, dec_order
+        )
+    return cube
+
+
+def _built_from(meta: Dict, data_digest: Optional[str], level_mfs: Dict, trend_mfs: Dict) -> bool:
+    # Persisted cubes record the data digest and calibration they were computed from
+    stored_mfs = (
+        {k: tuple(v) for k, v in meta["level_mfs"].items()},
+        {k: tuple(v) for k, v in meta["trend_mfs"].items()},
+    )
+    return meta.get("data_digest") == data_digest and _mfs_key(*stored_mfs) == _mfs_key(level_mfs, trend_mfs)
+
+
+_SUMMARY_NUMERIC = ["last_year", "share_last_pct", "slope_pp_per_year", "slope_pct_of_mean", "level_mu", "trend_mu"]
+_SLOPE_NUMERIC = ["slope_pp_per_year", "last_share"]
+
+
+def publish_window_arrays(
+    cube: Dict[int, WindowResult],
+    path: Path,
+    data_digest: Optional[str],
+    level_mfs: Dict[str, Tuple[float, float, float, float]],
+    trend_mfs: Dict[str, Tuple[float, float, float, float]],
+) -> None:
+    """Write the cube as flat arrays that `attach_window_arrays` maps read-only.
+
+    Windows are concatenated in start-year order and `summary_offsets`/`slope_offsets`
+    delimit each one's rows. Text becomes codes into the department list and the
+    label tuples; sentences are one UTF-8 buffer with offsets.
+    """
+    if not cube:
+        return
+    wins = [cube[start] for start in sorted(cube)]
+    summaries = pd.concat([w.summaries for w in wins], ignore_index=True)
+    slopes = pd.concat([w.slopes for w in wins], ignore_index=True)
+    codes, departments = pd.factorize(pd.concat([summaries["departement"], slopes["departement"]], ignore_index=True))
+    sentences = [text.encode("utf-8") for text in summaries["sentence"]]
+    arrays = {
+        "start_year": np.array([w.start_year for w in wins], dtype=np.int64),
+        "end_year": np.array([w.end_year for w in wins], dtype=np.int64),
+        "summary_offsets": np.cumsum([0] + [len(w.summaries) for w in wins]),
+        "slope_offsets": np.cumsum([0] + [len(w.slopes) for w in wins]),
+        "s_departement": codes[:len(summaries)].astype(np.int32),
+        "s_level_label": pd.Categorical(summaries["level_label"], categories=LEVEL_LABELS).codes.astype(np.int8),
+        "s_trend_label": pd.Categorical(summaries["trend_label"], categories=TREND_LABELS).codes.astype(np.int8),
+        "s_sentence_offsets": np.cumsum([0] + [len(b) for b in sentences]),
+        "s_sentence_bytes": np.frombuffer(b"".join(sentences), dtype=np.uint8),
+        "p_departement": codes[len(summaries):].astype(np.int32),
+        "p_inc_order": np.concatenate([np.asarray(w.inc_order, dtype=np.int32) for w in wins]),
+        "p_dec_order": np.concatenate([np.asarray(w.dec_order, dtype=np.int32) for w in wins]),
+    }
+    arrays.update((f"s_{c}", summaries[c].to_numpy(dtype=np.int64 if c == "last_year" else float)) for c in _SUMMARY_NUMERIC)
+    arrays.update((f"p_{c}", slopes[c].to_numpy(dtype=float)) for c in _SLOPE_NUMERIC)
+    colstore.write_arrays(arrays, path, {
+        "data_digest": data_digest,
+        "level_mfs": {k: list(v) for k, v in level_mfs.items()},
+        "trend_mfs": {k: list(v) for k, v in trend_mfs.items()},
+        "departments": [str(d) for d in departments],
+    })
+
+
+def _native(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _frame_record(frame: pd.DataFrame, i: int) -> Dict:
+    return {c: _native(frame[c].iat[i]) for c in frame.columns}
+
+
+class _SummaryRows(Mapping):
+    """`summary_by_dept` of a shared window: each record is built when it is looked up."""
+
+    def __init__(self, summaries: pd.DataFrame):
+        self._summaries = summaries
+        self._pos = {dept: i for i, dept in enumerate(summaries["departement"])}
+
+    def __getitem__(self, dept: str) -> Dict:
+        return _frame_record(self._summaries, self._pos[dept])
+
+    def __iter__(self):
+        return iter(self._pos)
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+
+class SharedWindowCube(Mapping):
+    """Read-only window cube over the memory-mapped arrays of `publish_window_arrays`.
+
+    Numeric columns stay views of the mapping, which every worker attached to the
+    same store shares through the page cache. Windows are assembled on first access,
+    so attaching costs one metadata read however large the cube is.
+    """
+
+    def __init__(self, departments: List[str], arrays: Dict[str, np.ndarray]):
+        self._arrays = arrays
+        self._names = np.asarray(departments, dtype=object)
+        self._starts = [int(y) for y in arrays["start_year"]]
+        self._index = {start: i for i, start in enumerate(self._starts)}
+        self._windows: Dict[int, WindowResult] = {}
+
+    def __getitem__(self, start: int) -> WindowResult:
+        window = self._windows.get(start)
+        if window is None:
+            window = self._windows[start] = self._assemble(self._index[start])
+        return window
+
+    def __iter__(self):
+        return iter(self._starts)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _assemble(self, i: int) -> WindowResult:
+        a = self._arrays
+        s0, s1 = int(a["summary_offsets"][i]), int(a["summary_offsets"][i + 1])
+        p0, p1 = int(a["slope_offsets"][i]), int(a["slope_offsets"][i + 1])
+        offsets = a["s_sentence_offsets"][s0:s1 + 1]
+        text = bytes(a["s_sentence_bytes"][offsets[0]:offsets[-1]]) if s1 > s0 else b""
+        bounds = (offsets - offsets[0]).tolist()
+        summaries = pd.DataFrame({
+            "departement": self._names[a["s_departement"][s0:s1]],
+            "level_label": np.asarray(LEVEL_LABELS, dtype=object)[a["s_level_label"][s0:s1]],
+            "trend_label": np.asarray(TREND_LABELS, dtype=object)[a["s_trend_label"][s0:s1]],
+            "sentence": [text[lo:hi].decode("utf-8") for lo, hi in zip(bounds[:-1], bounds[1:])],
+            **{c: a[f"s_{c}"][s0:s1] for c in _SUMMARY_NUMERIC},
+        }, columns=SUMMARY_COLUMNS, copy=False)
+        slopes = pd.DataFrame({
+            "departement": self._names[a["p_departement"][p0:p1]],
+            **{c: a[f"p_{c}"][p0:p1] for c in _SLOPE_NUMERIC},
+        }, columns=SLOPE_COLUMNS, copy=False)
+        inc_order = a["p_inc_order"][p0:p1].tolist()
+        dec_order = a["p_dec_order"][p0:p1].tolist()
+        return WindowResult(
+            start_year=self._starts[i],
+            end_year=int(a["end_year"][i]),
+            summaries=summaries,
+            slopes=slopes,
+            summary_by_dept=_SummaryRows(summaries),
+            dept_names=summaries["departement"].tolist(),
+            top_increases=[_frame_record(slopes, k) for k in inc_order[:2]],
+            top_decreases=[_frame_record(slopes, k) for k in dec_order[:2]],
+            inc_order=inc_order,
+            dec_order=dec_order,
+        )
+
+
+def attach_window_arrays(
+    path: Path,
+    data_digest: Optional[str],
+    level_mfs: Dict[str, Tuple[float, float, float, float]],
+    trend_mfs: Dict[str, Tuple[float, float, float, float]],
+) -> Optional[SharedWindowCube]:
+    """Map a published cube read-only, or None if it is missing or built from other data/calibration."""
+    if data_digest is None:
+        return None
+    loaded = colstore.read_arrays(path)
+    if loaded is None:
+        return None
+    meta, arrays = loaded
+    try:
+        if not _built_from(meta, data_digest, level_mfs, trend_mfs):
+            return None
+        return SharedWindowCube(meta["departments"], arrays)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class DatasetStore:
+    """Process-wide cache of one department-year aggregate, its calibration and per-window summaries.
+
+    The aggregate is loaded once and only re-read when the backing CSV changes: the
+    mtime/size signature is checked on every access and the content hash confirms a
+    real change before anything is invalidated. Windows come from the persisted
+    window cube when it matches the data and calibration (preferably the shared,
+    memory-mapped copy that `warm` publishes for other workers); anything else is memoized
+    in a bounded LRU keyed on the effective start year and the active calibration,
+    each sliced from one `ShareMatrix` of the whole table.
+
+    `source` is a data source as in `load_or_fetch` (default `ZRH_DATA_SOURCE`);
+    API fetches use `betrags_typ`. The default `calibration_path` is the process-wide
+    calibration of `ensure_calibration`; any other path (or None, in memory only) is
+    owned by this store and calibrated on its own data when missing.
+    """
+
+    def __init__(
+        self,
+        years: List[int],
+        max_windows: int = 32,
+        source: Optional[str] = None,
+        betrags_typ: str = BETRAGS_TYP,
+        calibration_path: Optional[Path] = CALIBRATION_PATH,
+    ):
+        self.years = list(years)
+        self.source = DATA_SOURCE if source is None else source
+        self.betrags_typ = betrags_typ
+        self.calibration_path = calibration_path
+        self.max_windows = max_windows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._df: Optional[pd.DataFrame] = None
+        self._path: Optional[Path] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._digest: Optional[str] = None
+        self._data_years: List[int] = []
+        self._mfs: Optional[Tuple[Dict, Dict]] = None
+        self._matrix: Optional[ShareMatrix] = None
+        self._windows: "OrderedDict[Tuple, WindowResult]" = OrderedDict()
+        self._cube: Mapping[int, WindowResult] = {}
+        self._cube_mfs: Optional[Tuple] = None
+        self._bytes: Optional[int] = None
+        self._generation = 0
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Content hash of the loaded CSV (None when the data came straight from the API)."""
+        return self._digest
+
+    @property
+    def loaded(self) -> bool:
+        return self._df is not None
+
+    def version_stamp(self) -> Tuple:
+        """Identify the data and calibration answers are currently computed from.
+
+        Changes whenever the aggregate is reloaded with different content or the
+        active calibration changes; cheap enough to check on every request.
+        """
+        with self._lock:
+            self._refresh()
+            level_mfs, trend_mfs = self.calibration()
+            return self._digest or f"generation-{self._generation}", _mfs_key(level_mfs, trend_mfs)
+
+    def calibration(self) -> Tuple[Dict, Dict]:
+        """Level and trend membership functions for this store's data."""
+        with self._lock:
+            if self._df is None:
+                self._refresh()
+            if self.calibration_path == CALIBRATION_PATH:
+                return ensure_calibration(self._df)
+            if self._mfs is None:
+                self._mfs = load_or_calibrate(self._df, self.calibration_path)
+            return self._mfs
+
+    def invalidate(self) -> None:
+        """Drop the data, windows and (for a store-owned calibration) membership functions."""
+        with self._lock:
+            self._df = None
+            self._path = self._signature = self._digest = None
+            self._data_years = []
+            self._mfs = None
+            self._matrix = None
+            self._windows.clear()
+            self._cube, self._cube_mfs = {}, None
+            self._bytes = None
+
+    def memory_bytes(self) -> int:
+        """Rough in-process size of the table, share matrix and windows; memory-mapped cubes are not counted."""
+        if self._bytes is not None:
+            # Cached until the next load or window build; readable without waiting on a running build
+            return self._bytes
+        with self._lock:
+            if self._bytes is None:
+                total = 0 if self._df is None else int(self._df.memory_usage(deep=True).sum())
+                if self._matrix is not None:
+                    total += self._matrix.amounts.nbytes + self._matrix.shares.nbytes + self._matrix.valid.nbytes
+                windows = list(self._windows.values())
+                if isinstance(self._cube, dict):
+                    windows.extend(self._cube.values())
+                for win in windows:
+                    total += int(win.summaries.memory_usage(deep=True).sum() + win.slopes.memory_usage(deep=True).sum())
+                self._bytes = total
+            return self._bytes
+
+    def stats(self) -> Dict:
+        """Current state for health checks: loaded, windows ready, cached size and digest.
+
+        Lock-free and side-effect free: nothing is loaded, built or measured, so it
+        answers while a build holds the lock (`bytes` is None until `memory_bytes` ran).
+        """
+        cube = self._cube
+        return {
+            "loaded": self._df is not None,
+            "windows": len(cube) if cube is not None else 0,
+            "cached_windows": len(self._windows),
+            "bytes": self._bytes,
+            "data_digest": self._digest,
+        }
+
+    def warm(self, build_missing: bool = True) -> int:
+        """Load data, calibration and the window cube up front; returns the number of windows ready.
+
+        Without a persisted cube (or with a stale one) every window is computed in memory
+        when `build_missing` is set, so servers answer their first request warm. The result
+        is published next to the CSV, where later workers attach to it instead of recomputing.
+        """
+        with self._lock:
+            self._refresh()
+            level_mfs, trend_mfs = self.calibration()
+            cube = self._precomputed(level_mfs, trend_mfs)
+            if not cube and build_missing and not self._df.empty:
+                self._cube = build_window_cube(self._df, level_mfs, trend_mfs, matrix=self._share_matrix())
+                self._bytes = None
+                if self._path is not None:
+                    try:
+                        publish_window_arrays(
+                            self._cube, window_cube_paths(self._path)[1], self._digest, level_mfs, trend_mfs
+                        )
+                    except OSError:
+                        pass
+            return len(self._cube)
+
+    def needs_fetch(self) -> bool:
+        """True when the next access would fetch the aggregate from the API (no CSV and nothing fetched yet).
+
+        Lock-free, so async callers can check it without waiting on a running build.
+        """
+        if is_synthetic(self.source):
+            return False
+        return source_csv(self.source) is None and (self._df is None or self._path is not None)
+
+    def adopt(self, df: pd.DataFrame) -> None:
+        """Install an aggregate fetched elsewhere (the async fetcher), as `_refresh` would after its own fetch."""
+        with self._lock:
+            if self.needs_fetch():
+                self._set(df, None, None, None)
+
+    def frame(self) -> pd.DataFrame:
+        """Return the aggregate table, reloading it only if the source changed."""
+        with self._lock:
+            self._refresh()
+            return self._df
+
+    def window(self, since_year: Optional[int]) -> Optional[WindowResult]:
+        """Return the (memoized) summaries for `jahr >= since_year`, or None if no rows remain."""
+        with self._lock:
+            self._refresh()
+            df_all = self._df
+            level_mfs, trend_mfs = self.calibration()
+            idx = 0 if since_year is None else bisect_left(self._data_years, since_year)
+            if idx >= len(self._data_years):
+                return None
+            start = self._data_years[idx]
+            precomputed = self._precomputed(level_mfs, trend_mfs).get(start)
+            if precomputed is not None:
+                self.hits += 1
+                instrument.count("window_cube_hit")
+                return precomputed
+            key = (start, _mfs_key(level_mfs, trend_mfs))
+            cached = self._windows.get(key)
+            if cached is not None:
+                self.hits += 1
+                instrument.count("window_cache_hit")
+                self._windows.move_to_end(key)
+                return cached
+            self.misses += 1
+            instrument.count("window_cache_miss")
+            df = df_all if since_year is None else df_all[df_all["jahr"] >= start]
+            with instrument.stage("build_window"):
+                result = build_window(df, level_mfs, trend_mfs, self._share_matrix().since(start))
+            self._windows[key] = result
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+            self._bytes = None
+            return result
+
+    def _share_matrix(self) -> ShareMatrix:
+        # Spending shares of the whole table, built on the first window miss of each data version
+        if self._matrix is None:
+            self._matrix = ShareMatrix.from_frame(self._df, spending_only=True)
+            self._bytes = None
+        return self._matrix
+
+    def _precomputed(self, level_mfs: Dict, trend_mfs: Dict) -> Mapping[int, WindowResult]:
+        # Checked once per data version and calibration; an empty dict means "compute on demand"
+        mfs_key = _mfs_key(level_mfs, trend_mfs)
+        if self._cube_mfs != mfs_key:
+            cube = None
+            if self._path is not None:
+                cube_path, arrays_path = window_cube_paths(self._path)
+                cube = attach_window_arrays(
+                    arrays_path, self._digest, level_mfs, trend_mfs
+                ) or load_window_cube(cube_path, self._digest, level_mfs, trend_mfs)
+            self._cube, self._cube_mfs = cube or {}, mfs_key
+            self._bytes = None
+        return self._cube
+
+    def _refresh(self) -> None:
+        if is_synthetic(self.source):
+            # Generated data never changes; the canonical spec doubles as its digest
+            if self._df is None:
+                spec = parse_spec(self.source)
+                with instrument.stage("load"):
+                    self._set(generate_budget(spec), None, None, spec.to_source())
+            return
+        path = source_csv(self.source)
+        if path is None:
+            # No cache on disk: fetch once and keep the result for the process lifetime
+            if self._df is None or self._path is not None:
+                with instrument.stage("load"):
+                    self._set(aggregate_department_totals(self.years, betrags_typ=self.betrags_typ), None, None, None)
+            return
+        st = path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        if self._df is not None and path == self._path and signature == self._signature:
+            return
+        with instrument.stage("load"):
+            # An up-to-date column store already knows the hash, so reloads skip reading the CSV at all
+            digest = colstore.cached_digest(path) or _file_digest(path)
+            if self._df is not None and digest == self._digest:
+                # Touched or moved but unchanged: keep the warm caches
+                self._path, self._signature = path, signature
+                return
+            self._set(colstore.read_table(path, digest)[0], path, signature, digest)
+
+    def _set(self, df: pd.DataFrame, path: Optional[Path], signature, digest: Optional[str]) -> None:
+        instrument.count("rows_loaded", len(df))
+        self._generation += 1
+        self._df = df
+        self._path, self._signature, self._digest = path, signature, digest
+        self._data_years = sorted(int(y) for y in df["jahr"].unique()) if not df.empty else []
+        if self.calibration_path is None:
+            # An in-memory calibration is derived from the data it was computed on
+            self._mfs = None
+        self._matrix = None
+        self._windows.clear()
+        self._cube, self._cube_mfs = {}, None
+        self._bytes = None
+
+
+DATASET_STORE = DatasetStore(YEARS)
+
+DEFAULT_DATASET = "zurich"
+# Budget for the loaded datasets together; 0 keeps every dataset loaded
+DATASET_MEMORY_BYTES = int(float(os.environ.get("ZRH_DATASET_MEMORY_MB", "1024")) * 1024 * 1024)
+# JSON file naming further datasets (see `DatasetRegistry.load_config`)
+DATASETS_CONFIG = os.environ.get("ZRH_DATASETS", "")
+
+
+class UnknownDataset(LookupError):
+    """A request named a dataset that is not registered."""
+
+
+class DatasetRegistry:
+    """Named `DatasetStore`s served from one process, e.g. budget vs. actuals, other cities or snapshots.
+
+    Each store owns its data, calibration and windows and loads them on first use.
+    After every access the least recently used stores are evicted (everything
+    dropped, reloaded on their next query) until the loaded ones fit `max_bytes`;
+    the store just used is never evicted. `max_bytes <= 0` disables the budget.
+    """
+
+    def __init__(self, max_bytes: int = DATASET_MEMORY_BYTES, default: str = DEFAULT_DATASET):
+        self.max_bytes = max_bytes
+        self.default = default
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._stores: Dict[str, DatasetStore] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+
+    def register(self, name: str, store: DatasetStore) -> DatasetStore:
+        with self._lock:
+            self._stores[name] = store
+        return store
+
+    def load_config(self, path: Path) -> List[str]:
+        """Register every dataset of a JSON config; returns their names.
+
+        The file maps names to entries like `{"source": "snapshots/2023.csv"}` or
+        `{"source": "api", "betrags_typ": "RECHNUNG", "years": [2019, 2020]}`.
+        `source` takes the forms of `load_or_fetch`; `calibration` is a calibration
+        file, "default" for the process-wide one, or null for in memory only. It
+        defaults to `<csv stem>.calibration.json` next to a CSV source and to null
+        otherwise. Relative paths are resolved against the config file.
+        """
+        path = Path(path)
+        with path.open("r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for name, entry in entries.items():
+            source = str(entry.get("source", ""))
+            csv = None
+            if source and source != "api" and not is_synthetic(source):
+                csv = path.parent / Path(source).expanduser()
+                source = str(csv)
+            calibration = entry.get("calibration")
+            if "calibration" not in entry:
+                calibration_path = csv.with_name(f"{csv.stem}.calibration.json") if csv is not None else None
+            elif calibration == "default":
+                calibration_path = CALIBRATION_PATH
+            else:
+                calibration_path = None if calibration is None else path.parent / Path(calibration).expanduser()
+            self.register(name, DatasetStore(
+                [int(y) for y in entry.get("years", YEARS)],
+                max_windows=int(entry.get("max_windows", 32)),
+                source=source,
+                betrags_typ=entry.get("betrags_typ", BETRAGS_TYP),
+                calibration_path=calibration_path,
+            ))
+        return list(entries)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._stores)
+
+    def get(self, name: Optional[str] = None) -> DatasetStore:
+        """The store registered as `name` (default dataset for None), marked as most recently used."""
+        name = self.default if name is None else name
+        with self._lock:
+            store = self._stores.get(name) if isinstance(name, str) else None
+            if store is None:
+                raise UnknownDataset(name)
+            self._recent[name] = None
+            self._recent.move_to_end(name)
+        return store
+
+    def window(self, name: Optional[str], since_year: Optional[int]) -> Optional[WindowResult]:
+        """`DatasetStore.window` of one dataset, then evict others if the budget is exceeded."""
+        name = self.default if name is None else name
+        result = self.get(name).window(since_year)
+        self.trim(keep=name)
+        return result
+
+    def warm(self, name: Optional[str] = None, build_missing: bool = True) -> int:
+        name = self.default if name is None else name
+        windows = self.get(name).warm(build_missing)
+        self.trim(keep=name)
+        return windows
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one dataset's data and caches, or every dataset's when `name` is None."""
+        if name is not None:
+            self.get(name).invalidate()
+            return
+        with self._lock:
+            stores = list(self._stores.values())
+        for store in stores:
+            store.invalidate()
+
+    def trim(self, keep: Optional[str] = None) -> int:
+        """Evict least recently used datasets until the loaded ones fit `max_bytes`; returns how many."""
+        if self.max_bytes <= 0:
+            return 0
+        with self._lock:
+            order = list(self._recent)
+        sizes = {name: self._stores[name].memory_bytes() for name in order}
+        total = sum(sizes.values())
+        evicted = 0
+        for name in order:
+            if total <= self.max_bytes:
+                break
+            if name == keep or not sizes[name]:
+                continue
+            self._stores[name].invalidate()
+            total -= sizes[name]
+            evicted += 1
+            with self._lock:
+                self._recent.pop(name, None)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+            instrument.count("dataset_evicted", evicted)
+        return evicted
+
+    def stats(self) -> Dict:
+        """`DatasetStore.stats` of every dataset plus the eviction budget; never loads or evicts."""
+        with self._lock:
+            stores = sorted(self._stores.items())
+        return {
+            "default": self.default,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "datasets": {name: store.stats() for name, store in stores},
+        }
+
+
+DATASETS = DatasetRegistry()
+DATASETS.register(DEFAULT_DATASET, DATASET_STORE)
+if DATASETS_CONFIG:
+    DATASETS.load_config(Path(DATASETS_CONFIG))
 
 
 def _flex_match_department(dept_query: str, available: List[str]) -> Optional[str]:
@@ -407,6 +1536,43 @@ def _flex_match_department(dept_query: str, available: List[str]) -> Optional[st
     return None
 
 
+def requested_since(request: Dict) -> Optional[int]:
+    """Parse the request's timeline filter into a start year (None = whole history)."""
+    timeline = request.get("timeline", "all")
+    since_year = None
+    if isinstance(timeline, dict) and "since" in timeline:
+        since_year = int(timeline["since"]) if timeline["since"] is not None else None
+    elif isinstance(timeline, (int, str)) and str(timeline).isdigit():
+        since_year = int(timeline)
+    return since_year
+
+
+def validate_request(request: Dict) -> None:
+    """Raise ValueError if a request field has a value `answer_request` cannot use."""
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    try:
+        requested_since(request)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid timeline {request.get('timeline')!r}: expected \"all\" or {{\"since\": <year>}}")
+    field = request.get("field")
+    if field is not None and not isinstance(field, str):
+        raise ValueError(f"invalid field {field!r}: expected a string")
+
+
+def requested_dataset(request: Dict) -> Optional[str]:
+    """The registry name the request asks for (None = the default dataset)."""
+    name = request.get("dataset")
+    return None if name is None else str(name)
+
+
+def _unknown_dataset(request: Dict) -> Dict:
+    return {
+        "message": f"Unknown dataset '{requested_dataset(request)}'. Try one of: {', '.join(DATASETS.names())}.",
+        "request": request,
+    }
+
+
 def answer_request(request: Dict) -> Dict:
     """Serve a minimal request/response, aligning with the slide artifact.
 
@@ -414,27 +1580,90 @@ def answer_request(request: Dict) -> Dict:
       - timeline: "all" (default) or {"since": 2019}
       - field: department/topic (e.g., "education" or official German name) or "all"
       - generalization_level: 0, 1, or 2 (string or int)
+      - dataset: a name registered in `DATASETS` (optional; default "zurich")
     """
-    # Parse timeline filters
-    timeline = request.get("timeline", "all")
-    since_year = None
-    if isinstance(timeline, dict) and "since" in timeline:
-        since_year = int(timeline["since"]) if timeline["since"] is not None else None
-    elif isinstance(timeline, (int, str)) and str(timeline).isdigit():
-        since_year = int(timeline)
+    # Prefer cached CSVs; fall back to API fetch. Windows are memoized process-wide.
+    with instrument.trace() as timings:
+        try:
+            window = DATASETS.window(requested_dataset(request), requested_since(request))
+        except UnknownDataset:
+            return _unknown_dataset(request)
+        with instrument.stage("answer"):
+            response = answer_from_window(request, window)
+    if timings is not None:
+        response["timings"] = timings.as_dict()
+    return response
 
-    # Prefer cached CSVs; fall back to API fetch
-    df_all = load_or_fetch(YEARS)
-    level_mfs, trend_mfs = ensure_calibration(df_all)
-    df = df_all.copy()
-    if since_year is not None:
-        df = df[df["jahr"] >= since_year]
-    if df.empty:
-        return {"message": "No data available for the requested timeline.", "request": request}
 
-    # Summaries use spending only to mirror public-spending narratives
-    summaries = summarize(df, spending_only=True, level_mfs=level_mfs, trend_mfs=trend_mfs)
-    if summaries.empty:
+def answer_requests(batch: List[Dict]) -> List[Dict]:
+    """Answer many requests in one pass: each distinct dataset and timeline window is resolved once."""
+    windows: Dict[Tuple[Optional[str], Optional[int]], Optional[WindowResult]] = {}
+    unknown = set()
+    responses = []
+    for request in batch:
+        key = (requested_dataset(request), requested_since(request))
+        if key not in windows:
+            try:
+                windows[key] = DATASETS.window(*key)
+            except UnknownDataset:
+                windows[key] = None
+                unknown.add(key)
+        with instrument.stage("answer"):
+            if key in unknown:
+                responses.append(_unknown_dataset(request))
+            else:
+                responses.append(answer_from_window(request, windows[key]))
+    return responses
+
+
+# Coalesces concurrent async loads: one API fetch / window build per key however many requests wait on it
+SINGLE_FLIGHT = SingleFlight()
+
+
+async def _window_async(
+    dataset: Optional[str], since_year: Optional[int], executor: Optional[Executor]
+) -> Optional[WindowResult]:
+    loop = asyncio.get_running_loop()
+    name = DATASETS.default if dataset is None else dataset
+    store = DATASETS.get(name)
+    if store.needs_fetch():
+        async def fetch() -> None:
+            df = await aggregate_department_totals_async(store.years, betrags_typ=store.betrags_typ)
+            await loop.run_in_executor(executor, store.adopt, df)
+
+        await SINGLE_FLIGHT.do(("aggregate", name), fetch)
+    # Loading, calibration and summarizing are CPU-bound: keep them off the event loop
+    ctx = contextvars.copy_context()
+    return await SINGLE_FLIGHT.do(
+        ("window", name, since_year),
+        lambda: loop.run_in_executor(executor, ctx.run, DATASETS.window, name, since_year),
+    )
+
+
+async def answer_request_async(request: Dict, executor: Optional[Executor] = None) -> Dict:
+    """`answer_request` for asyncio servers.
+
+    A missing aggregate is fetched with the async fetcher and window builds run on
+    `executor` (the loop's default when None); concurrent requests waiting on the
+    same fetch or window share one call instead of each starting their own.
+    """
+    with instrument.trace() as timings:
+        try:
+            window = await _window_async(requested_dataset(request), requested_since(request), executor)
+        except UnknownDataset:
+            return _unknown_dataset(request)
+        with instrument.stage("answer"):
+            response = answer_from_window(request, window)
+    if timings is not None:
+        response["timings"] = timings.as_dict()
+    return response
+
+
+def answer_from_window(request: Dict, window: Optional[WindowResult]) -> Dict:
+    """Build the response for `request` from an already resolved timeline window."""
+    if window is None:
+        return {"message": "No data available for the requested timeline.", "request": request}
+    if window.summaries.empty:
         return {"message": "No spending data found for the requested timeline.", "request": request}
 
     # Normalize the requested field
@@ -446,35 +1675,18 @@ def answer_request(request: Dict) -> Dict:
         gen_level = 1
 
     # Track the year window for the filtered slice
-    start_year = int(df["jahr"].min())
-    end_year = int(df["jahr"].max())
-
-    # Helper: recompute slopes within the filtered window
-    def _compute_slopes() -> pd.DataFrame:
-        # Recompute shares within the window (spending only)
-        df_win = df[df["betrag"] > 0].copy()
-        totals = df_win.groupby("jahr", as_index=False)["betrag"].sum().rename(columns={"betrag": "city_total"})
-        merged = df_win.merge(totals, on="jahr", how="left")
-        merged["share_pct"] = (merged["betrag"] / merged["city_total"]) * 100.0
-        rows = []
-        for dept, grp in merged.groupby("departement_name"):
-            grp = grp.sort_values("jahr")
-            shares = grp["share_pct"].tolist()
-            years = grp["jahr"].tolist()
-            if len(shares) < 2:
-                continue
-            slope = theil_sen_slope(years, shares)
-            rows.append({"departement": dept, "slope_pp_per_year": slope, "last_share": shares[-1]})
-        return pd.DataFrame(rows)
-
-    slopes_df = _compute_slopes()
+    start_year = window.start_year
+    end_year = window.end_year
 
     if field == "all":
+        if not window.top_increases:
+            return {"message": f"Not enough years between {start_year} and {end_year} to rank departments.",
+                    "request": request}
         # Report the biggest movers across departments
-        top_inc = slopes_df.sort_values("slope_pp_per_year", ascending=False).head(2)
-        top_dec = slopes_df.sort_values("slope_pp_per_year", ascending=True).head(2)
-        inc_list = [f"{r['departement']} ({r['slope_pp_per_year']:+.2f} pp/yr)" for _, r in top_inc.iterrows()]
-        dec_list = [f"{r['departement']} ({r['slope_pp_per_year']:+.2f} pp/yr)" for _, r in top_dec.iterrows()]
+        top_inc = [dict(r) for r in window.top_increases]
+        top_dec = [dict(r) for r in window.top_decreases]
+        inc_list = [f"{r['departement']} ({r['slope_pp_per_year']:+.2f} pp/yr)" for r in top_inc]
+        dec_list = [f"{r['departement']} ({r['slope_pp_per_year']:+.2f} pp/yr)" for r in top_dec]
         msg = (
             f"Between {start_year} and {end_year}, the biggest increases are in "
             f"{', '.join(inc_list)}."
@@ -484,26 +1696,23 @@ def answer_request(request: Dict) -> Dict:
         return {
             "message": msg,
             "request": request,
-            "top_increases": top_inc.to_dict(orient="records"),
-            "top_decreases": top_dec.to_dict(orient="records"),
+            "top_increases": top_inc,
+            "top_decreases": top_dec,
         }
 
     # Resolve the department from the provided field text
-    dept_names = summaries["departement"].unique().tolist()
-    dept = _flex_match_department(field, dept_names)
+    dept = _flex_match_department(field, window.dept_names)
     if not dept:
         return {"message": f"Unknown field '{field}'. Try one of: all, education, healthcare, transport, energy.", "request": request}
 
-    row = summaries[summaries["departement"] == dept].sort_values("last_year", ascending=False).head(1)
-    if row.empty:
+    r = window.summary_by_dept.get(dept)
+    if r is None:
         return {"message": f"No data found for '{dept}' in the requested timeline.", "request": request}
 
-    r = row.iloc[0]
     # Optionally mention where the biggest increases are citywide
     extra = ""
-    if gen_level >= 1 and not slopes_df.empty:
-        top_inc = slopes_df.sort_values("slope_pp_per_year", ascending=False).head(2)
-        inc_list = [f"{x['departement']}" for _, x in top_inc.iterrows()]
+    if gen_level >= 1 and window.top_increases:
+        inc_list = [f"{x['departement']}" for x in window.top_increases]
         extra = f" Meanwhile, the biggest increases are in {', '.join(inc_list)}."
 
     msg = (
@@ -526,7 +1735,64 @@ def answer_request(request: Dict) -> Dict:
         },
     }
 
+def stream_requests_jsonl(lines, out, group_windows: bool = False, chunk_size: int = 1000) -> int:
+    """Answer one JSON request per input line and write one JSON response per output line.
+
+    Data and calibration are loaded once up front. With `group_windows`, lines are
+    answered in chunks so identical timeline windows share one lookup; output order
+    always follows input order. Malformed lines and requests with unusable fields
+    (see `validate_request`) yield an `error` object instead of aborting the stream. Returns the number of responses written.
+    """
+    DATASET_STORE.warm()
+    written = 0
+    pending: List[Tuple[int, Optional[Dict], Optional[str]]] = []
+
+    def _flush() -> None:
+        nonlocal written
+        valid = [req for _, req, _ in pending if req is not None]
+        answers = iter(answer_requests(valid) if group_windows else [])
+        for line_no, req, err in pending:
+            if req is None:
+                resp = {"error": err, "line": line_no}
+            else:
+                resp = next(answers) if group_windows else answer_request(req)
+            out.write(json.dumps(resp, ensure_ascii=False) + "\n")
+            written += 1
+        out.flush()
+        pending.clear()
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+            validate_request(req)
+            pending.append((line_no, req, None))
+        except ValueError as e:
+            pending.append((line_no, None, f"Invalid request: {e}"))
+        if not group_windows or len(pending) >= chunk_size:
+            _flush()
+    if pending:
+        _flush()
+    return written
+
 def main():
+    # Stream many requests through one process: one JSON request in, one JSON response out per line
+    if "--requests-jsonl" in sys.argv:
+        idx = sys.argv.index("--requests-jsonl")
+        src = sys.argv[idx + 1] if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith("--") else "-"
+        group = "--group-windows" in sys.argv
+        chunk_size = 1000
+        if "--chunk-size" in sys.argv:
+            chunk_size = int(sys.argv[sys.argv.index("--chunk-size") + 1])
+        if src == "-":
+            stream_requests_jsonl(sys.stdin, sys.stdout, group, chunk_size)
+        else:
+            with open(src, "r", encoding="utf-8") as f:
+                stream_requests_jsonl(f, sys.stdout, group, chunk_size)
+        return
+
     # Serve API-style responses when --request is provided; otherwise run batch mode and persist CSVs
     if "--request" in sys.argv:
         idx = sys.argv.index("--request")
@@ -547,7 +1813,15 @@ def main():
         return
 
     print("Preparing Zurich budget summaries (spending-only) ...", file=sys.stderr)
-    out = load_or_fetch(YEARS)
+    if "--sync" in sys.argv:
+        # Incremental refresh: only missing, stale or explicitly invalidated cells hit the API
+        invalidate = [parse_cell_spec(sys.argv[i + 1]) for i, a in enumerate(sys.argv[:-1]) if a == "--invalidate"]
+        max_age = None
+        if "--max-age-days" in sys.argv:
+            max_age = float(sys.argv[sys.argv.index("--max-age-days") + 1])
+        out = sync_department_totals(YEARS, invalidate=invalidate, max_age_days=max_age)
+    else:
+        out = load_or_fetch(YEARS)
     level_mfs, trend_mfs = ensure_calibration(out)
     print(f"Rows available: {len(out)}", file=sys.stderr)
     summaries = summarize(out, spending_only=True, level_mfs=level_mfs, trend_mfs=trend_mfs)
@@ -560,12 +1834,25 @@ def main():
     else:
         print("No summaries available.")
 
+    if DATA_SOURCE and DATA_SOURCE != "api":
+        print("\nNot the default data source: not overwriting the cached CSVs.")
+        return
+
     # Save CSV outputs for offline runs
     out_path1 = "zrh_budget_by_dept_year.csv"
     out_path2 = "zrh_budget_linguistic_summaries.csv"
     out.to_csv(out_path1, index=False)
     summaries.to_csv(out_path2, index=False)
-    print(f"\nSaved: {out_path1} and {out_path2}")
+    digest = _file_digest(Path(out_path1))
+    # Binary column stores next to the CSVs: later loads memory-map instead of parsing
+    colstore.write_table(out, Path(out_path1), digest)
+    colstore.write_table(summaries.reset_index(drop=True), Path(out_path2))
+    # Precompute every `since` window so servers answer with lookups only
+    cube_path = Path(out_path1).with_name(WINDOW_CUBE_NAME)
+    cube = build_window_cube(out, level_mfs, trend_mfs)
+    save_window_cube(cube, cube_path, digest, level_mfs, trend_mfs)
+    publish_window_arrays(cube, cube_path.with_name(WINDOW_ARRAYS_NAME), digest, level_mfs, trend_mfs)
+    print(f"\nSaved: {out_path1}, {out_path2}, their {colstore.STORE_SUFFIX} stores and {cube_path} ({len(cube)} windows)")
 
 if __name__ == "__main__":
     main()